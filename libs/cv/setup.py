@@ -9,9 +9,12 @@ setup(
     package_dir={"": "src"},
     install_requires=[
         "numpy>=1.21.0",
-        "opencv-python>=4.5.0",
-        "opencv-contrib-python>=4.5.0",
+        "opencv-python>=4.7.0",
+        "opencv-contrib-python>=4.7.0",
     ],
+    extras_require={
+        "jit": ["numba>=0.58.0"],
+    },
     python_requires=">=3.9",
     classifiers=[
         "Development Status :: 4 - Beta",
@@ -1,11 +1,21 @@
 """Color CV Library - Computer Vision Algorithms for Color Correction"""
 
-from .aruco_detector import ArucoDetector, CardDetectionResult, CardOrientation, PatchROI
-from .white_balance import WhiteBalancer, WhiteBalanceMethod
-from .ccm import ColorCorrectionMatrix
-from .delta_e import DeltaECalculator
+import importlib
 
 __version__ = "1.0.0"
+
+# Public name -> submodule; submodules (and OpenCV) are imported on first access
+_LAZY_IMPORTS = {
+    "ArucoDetector": ".aruco_detector",
+    "CardDetectionResult": ".aruco_detector",
+    "CardOrientation": ".aruco_detector",
+    "PatchROI": ".aruco_detector",
+    "WhiteBalancer": ".white_balance",
+    "WhiteBalanceMethod": ".white_balance",
+    "ColorCorrectionMatrix": ".ccm",
+    "DeltaECalculator": ".delta_e",
+}
+
 __all__ = [
     "ArucoDetector",
     "CardDetectionResult",
@@ -16,3 +26,19 @@ __all__ = [
     "ColorCorrectionMatrix",
     "DeltaECalculator",
 ]
+
+
+def __getattr__(name):
+    """Resolve public classes lazily (PEP 562)."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # cache so later lookups bypass __getattr__
+    return value
+
+
+def __dir__():
+    """Include lazily imported names in dir() / autocompletion."""
+    return sorted(set(globals()) | set(__all__))
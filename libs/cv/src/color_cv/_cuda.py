@@ -0,0 +1,30 @@
+"""Optional OpenCV CUDA support.
+
+The ``cv2.cuda`` image-processing functions only exist in OpenCV builds
+compiled with CUDA (the PyPI wheels do not include them). ``CUDA_AVAILABLE``
+is True only when those functions are present and a device is visible, so
+callers can fall back to the CPU code paths.
+"""
+
+import cv2
+
+
+def _cuda_device_count() -> int:
+    """Number of CUDA devices OpenCV can use (0 for non-CUDA builds)."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount()
+    except (AttributeError, cv2.error):
+        return 0
+
+
+CUDA_AVAILABLE = hasattr(cv2, "cuda") and hasattr(cv2.cuda, "warpPerspective") and _cuda_device_count() > 0
+
+GpuMat = getattr(cv2, "cuda_GpuMat", None)
+
+
+def is_gpu_mat(obj) -> bool:
+    """Check whether obj is a device-resident cv2.cuda_GpuMat."""
+    return GpuMat is not None and isinstance(obj, GpuMat)
+
+
+__all__ = ["CUDA_AVAILABLE", "GpuMat", "is_gpu_mat"]
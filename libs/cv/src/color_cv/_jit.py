@@ -0,0 +1,26 @@
+"""Optional Numba JIT support.
+
+Numba is an optional dependency (``pip install color-cv[jit]``). When it is
+not installed, ``njit`` is a no-op decorator, ``prange`` is ``range`` and
+``NUMBA_AVAILABLE`` is False so callers can fall back to NumPy code paths.
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when Numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        
+        def decorator(func):
+            return func
+        
+        return decorator
+
+
+__all__ = ["NUMBA_AVAILABLE", "njit", "prange"]
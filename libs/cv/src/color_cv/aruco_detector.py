@@ -4,12 +4,15 @@ Detects color calibration cards using 4 corner ArUco markers (IDs 0-3).
 Provides perspective correction and color patch extraction.
 """
 
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
 from enum import Enum
 import numpy as np
 import cv2
 
+from ._cuda import is_gpu_mat
+
 
 class CardOrientation(Enum):
     """Card rotation state"""
@@ -19,6 +22,15 @@ class CardOrientation(Enum):
     ROTATED_270 = 3
 
 
+# Orientation for each 90-degree bin of the TL-corner angle, see _infer_orientation
+_ORIENTATION_BINS = (
+    CardOrientation.NORMAL,
+    CardOrientation.ROTATED_90,
+    CardOrientation.ROTATED_180,
+    CardOrientation.ROTATED_270,
+)
+
+
 @dataclass
 class PatchROI:
     """Single color patch region of interest"""
@@ -56,46 +68,58 @@ class ArucoDetector:
         self,
         corner_refinement: bool = True,
         min_marker_size: int = 20,
-        specular_threshold: float = 0.95
+        specular_threshold: float = 0.95,
+        warp_cache_size: int = 4
     ):
         self.aruco_dict = cv2.aruco.getPredefinedDictionary(self.ARUCO_DICT)
         self.aruco_params = cv2.aruco.DetectorParameters()
         if corner_refinement:
             self.aruco_params.cornerRefinementMethod = cv2.aruco.CORNER_REFINE_SUBPIX
+            self.aruco_params.cornerRefinementWinSize = 10
+            # OpenCV >= 4.9 scales the subpixel window with the marker size
+            if hasattr(self.aruco_params, "relativeCornerRefinmentWinSize"):
+                self.aruco_params.relativeCornerRefinmentWinSize = 0.3
         self.aruco_params.minMarkerPerimeterRate = min_marker_size / 1000.0
         self.specular_threshold = specular_threshold
+        
+        # Reusable detector keeps the validated dictionary/parameters around
+        self._detector = cv2.aruco.ArucoDetector(self.aruco_dict, self.aruco_params)
+        
+        # Remap tables for recently seen homographies (fixed rigs / video)
+        self.warp_cache_size = warp_cache_size
+        self._warp_maps: "OrderedDict[bytes, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
     
     def detect(self, image: np.ndarray, extract_patches: bool = True) -> Optional[CardDetectionResult]:
-        """Detect color card in image"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        """Detect color card in image.
+        
+        image may be a cv2.cuda_GpuMat: grayscale conversion and the warp run
+        on the GPU, marker detection on the CPU (ArUco has no CUDA version).
+        """
+        on_gpu = is_gpu_mat(image)
+        if on_gpu:
+            gray = cv2.cuda.cvtColor(image, cv2.COLOR_BGR2GRAY).download()
+            width, height = image.size()
+            image_shape = (height, width, image.channels())
+        else:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            image_shape = image.shape
         
         # Detect ArUco markers
-        corners_list, ids, _ = cv2.aruco.detectMarkers(
-            gray, self.aruco_dict, parameters=self.aruco_params
-        )
+        corners_list, ids, _ = self._detector.detectMarkers(gray)
         
         if ids is None or len(ids) < 4:
             return None
         
-        # Map marker IDs to corners
-        marker_corners = {}
-        for corner, marker_id in zip(corners_list, ids.flatten()):
-            if marker_id in self.MARKER_IDS:
-                marker_corners[marker_id] = corner[0]
-        
-        if len(marker_corners) < 4:
+        # Locate the last detection of each card marker ID (TL, TR, BR, BL)
+        ids_arr = ids.ravel()
+        matches = ids_arr[None, :] == np.asarray(self.MARKER_IDS)[:, None]  # (4, n)
+        if not matches.any(axis=1).all():
             return None
+        last = ids_arr.size - 1 - np.argmax(matches[:, ::-1], axis=1)
         
-        # Order corners: TL, TR, BR, BL
-        try:
-            card_corners = np.float32([
-                marker_corners[0].mean(axis=0),
-                marker_corners[1].mean(axis=0),
-                marker_corners[2].mean(axis=0),
-                marker_corners[3].mean(axis=0),
-            ])
-        except KeyError:
-            return None
+        # Marker quads as one (4, 4, 2) block; card corners are their centroids
+        marker_quads = np.stack([corners_list[i][0] for i in last])
+        card_corners = marker_quads.mean(axis=1).astype(np.float32)
         
         # Compute homography
         canonical_width = 600
@@ -107,8 +131,24 @@ class ArucoDetector:
             [0, canonical_height]
         ])
         
-        homography, _ = cv2.findHomography(card_corners, dst_corners, cv2.RANSAC)
-        warped = cv2.warpPerspective(image, homography, (canonical_width, canonical_height))
+        # Oriented constraint: TL, TR, BR, BL must keep the canonical winding
+        # (positive shoelace area with y down); mirrored or self-intersecting
+        # corner sets would otherwise produce a flipped warp
+        x, y = card_corners[:, 0], card_corners[:, 1]
+        signed_area = np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)
+        if signed_area <= 0:
+            return None
+        
+        # Exactly 4 correspondences: solve the DLT directly, RANSAC adds nothing
+        homography = cv2.getPerspectiveTransform(card_corners, dst_corners)
+        if on_gpu:
+            # Fresh dst buffer: in-place (src is dst) CUDA warps are unsafe
+            warped = cv2.cuda.warpPerspective(
+                image, homography, (canonical_width, canonical_height),
+                flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE
+            ).download()
+        else:
+            warped = self._warp(image, homography, (canonical_width, canonical_height))
         
         # Determine orientation
         orientation = self._infer_orientation(card_corners)
@@ -118,7 +158,7 @@ class ArucoDetector:
         if extract_patches:
             patches = self._extract_patches(warped)
         
-        confidence = self._compute_confidence(marker_corners, image.shape)
+        confidence = self._compute_confidence(marker_quads, image_shape)
         
         return CardDetectionResult(
             corners=card_corners,
@@ -129,25 +169,38 @@ class ArucoDetector:
             image_warped=warped
         )
     
+    def _warp(self, image: np.ndarray, homography: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+        """Perspective-warp image, reusing cached remap tables for repeated homographies"""
+        if self.warp_cache_size <= 0:
+            return cv2.warpPerspective(image, homography, size)
+        
+        key = homography.tobytes() + np.int32(size).tobytes()
+        maps = self._warp_maps.get(key)
+        if maps is None:
+            # Identity camera/no distortion: the map is dst -> inv(H) @ dst, as in warpPerspective
+            maps = cv2.initUndistortRectifyMap(
+                np.eye(3), None, homography, np.eye(3), size, cv2.CV_16SC2
+            )
+            self._warp_maps[key] = maps
+            if len(self._warp_maps) > self.warp_cache_size:
+                self._warp_maps.popitem(last=False)
+        else:
+            self._warp_maps.move_to_end(key)
+        
+        return cv2.remap(image, maps[0], maps[1], cv2.INTER_LINEAR)
+    
     def _infer_orientation(self, corners: np.ndarray) -> CardOrientation:
         """Infer card rotation from corner positions"""
         center = corners.mean(axis=0)
         tl_to_center = corners[0] - center
-        angle = np.arctan2(tl_to_center[1], tl_to_center[0])
-        angle_deg = np.degrees(angle)
-        
-        if -45 <= angle_deg < 45:
-            return CardOrientation.NORMAL
-        elif 45 <= angle_deg < 135:
-            return CardOrientation.ROTATED_90
-        elif angle_deg >= 135 or angle_deg < -135:
-            return CardOrientation.ROTATED_180
-        else:
-            return CardOrientation.ROTATED_270
+        angle_deg = np.degrees(np.arctan2(tl_to_center[1], tl_to_center[0]))
+        
+        # 90-degree bins centred on 0, 90, 180, 270 degrees
+        idx = int((angle_deg + 45) // 90) % 4
+        return _ORIENTATION_BINS[idx]
     
     def _extract_patches(self, warped: np.ndarray) -> List[PatchROI]:
         """Extract color patches from warped card image"""
-        patches = []
         h, w = warped.shape[:2]
         cols, rows = self.PATCH_GRID
         
@@ -160,35 +213,51 @@ class ArucoDetector:
         patch_w = grid_w / cols
         patch_h = grid_h / rows
         
-        patch_id = 0
-        for row in range(rows):
-            for col in range(cols):
-                x = int(margin_x + col * patch_w + patch_w * 0.2)
-                y = int(margin_y + row * patch_h + patch_h * 0.2)
-                w_patch = int(patch_w * 0.6)
-                h_patch = int(patch_h * 0.6)
-                
-                roi = warped[y:y+h_patch, x:x+w_patch]
-                mean_rgb = roi.mean(axis=(0, 1))
-                std_dev = roi.std()
-                
-                # Check for specular highlights
-                max_val = roi.max()
-                is_specular = (max_val / 255.0) > self.specular_threshold
-                
-                patches.append(PatchROI(
-                    patch_id=patch_id,
-                    center=(x + w_patch//2, y + h_patch//2),
-                    bbox=(x, y, w_patch, h_patch),
-                    mean_rgb=mean_rgb,
-                    std_dev=std_dev,
-                    is_specular=is_specular
-                ))
-                patch_id += 1
+        w_patch = int(patch_w * 0.6)
+        h_patch = int(patch_h * 0.6)
+        
+        # Top-left corner of every patch column / row
+        xs = (margin_x + np.arange(cols) * patch_w + patch_w * 0.2).astype(np.intp)
+        ys = (margin_y + np.arange(rows) * patch_h + patch_h * 0.2).astype(np.intp)
+        
+        # All patches share the same size, so indexing a sliding-window view
+        # at the patch origins gathers every ROI into one (N, C, h*w) block
+        windows = np.lib.stride_tricks.sliding_window_view(
+            warped, (h_patch, w_patch), axis=(0, 1)
+        )
+        rois = np.ascontiguousarray(windows[ys[:, None], xs[None, :]])
+        rois = rois.reshape(rows * cols, warped.shape[2], -1)
+        flat = rois.reshape(rows * cols, -1)
+        
+        # Per-patch sums and sums of squares give mean and std in one pass
+        rois_f = rois.astype(np.float64)
+        flat_f = rois_f.reshape(rows * cols, -1)
+        mean_rgb = np.einsum('ijk->ij', rois_f) / rois.shape[2]
+        mean_all = flat_f.sum(axis=1) / flat.shape[1]
+        sq_mean = np.einsum('ij,ij->i', flat_f, flat_f) / flat.shape[1]
+        std_dev = np.sqrt(np.maximum(sq_mean - mean_all ** 2, 0.0))
+        
+        # Check for specular highlights
+        max_val = flat.max(axis=1)
+        is_specular = (max_val / 255.0) > self.specular_threshold
+        
+        x0 = np.tile(xs, rows)
+        y0 = np.repeat(ys, cols)
+        patches = [
+            PatchROI(
+                patch_id=patch_id,
+                center=(x + w_patch//2, y + h_patch//2),
+                bbox=(x, y, w_patch, h_patch),
+                mean_rgb=mean_rgb[patch_id],
+                std_dev=std_dev[patch_id],
+                is_specular=bool(is_specular[patch_id])
+            )
+            for patch_id, (x, y) in enumerate(zip(x0.tolist(), y0.tolist()))
+        ]
         
         return patches
     
-    def _compute_confidence(self, marker_corners: dict, image_shape: tuple) -> float:
+    def _compute_confidence(self, marker_corners: np.ndarray, image_shape: tuple) -> float:
         """Compute detection confidence score"""
         if len(marker_corners) < 4:
             return 0.0
@@ -196,14 +265,10 @@ class ArucoDetector:
         # Base confidence on number of markers and their size
         marker_count_score = len(marker_corners) / 4.0
         
-        # Calculate average marker size
-        marker_sizes = []
-        for corners in marker_corners.values():
-            w = np.linalg.norm(corners[0] - corners[1])
-            h = np.linalg.norm(corners[1] - corners[2])
-            marker_sizes.append((w + h) / 2)
-        
-        avg_size = np.mean(marker_sizes)
+        # Average marker size from all edge lengths of the (N, 4, 2) quads at once
+        w = np.linalg.norm(marker_corners[:, 0] - marker_corners[:, 1], axis=1)
+        h = np.linalg.norm(marker_corners[:, 1] - marker_corners[:, 2], axis=1)
+        avg_size = float(((w + h) * 0.5).mean())
         image_size = min(image_shape[:2])
         size_ratio = avg_size / image_size
         
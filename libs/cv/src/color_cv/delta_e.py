@@ -1,14 +1,111 @@
 """Delta E (ΔE) color difference calculations."""
 
+import math
 import numpy as np
 from typing import Union, Tuple
 import cv2
 
+from ._jit import NUMBA_AVAILABLE, njit, prange
+
+# CIEDE2000 chroma weighting constant (25^7), shared by both code paths
+_POW25_7 = 25.0 ** 7
+
+
+def _srgb_to_linear(c: np.ndarray) -> np.ndarray:
+    """Decode sRGB gamma for values in [0, 1]."""
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+# Gamma decode for every 8-bit value, so uint8 input is a single table lookup
+_SRGB_LIN_LUT = _srgb_to_linear(np.arange(256) / 255.0).astype(np.float32)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _de2000_kernel(L1, a1, b1, L2, a2, b2):
+    """CIEDE2000 over 1-D arrays of LAB components, one pixel per iteration."""
+    n = L1.shape[0]
+    out = np.empty(n, dtype=np.float32)
+    for i in prange(n):
+        C1 = math.sqrt(a1[i] * a1[i] + b1[i] * b1[i])
+        C2 = math.sqrt(a2[i] * a2[i] + b2[i] * b2[i])
+        C_bar = (C1 + C2) / 2.0
+        C_bar7 = C_bar * C_bar * C_bar * C_bar * C_bar * C_bar * C_bar
+        G = 0.5 * (1.0 - math.sqrt(C_bar7 / (C_bar7 + _POW25_7)))
+        
+        a1_prime = (1.0 + G) * a1[i]
+        a2_prime = (1.0 + G) * a2[i]
+        C1_prime = math.sqrt(a1_prime * a1_prime + b1[i] * b1[i])
+        C2_prime = math.sqrt(a2_prime * a2_prime + b2[i] * b2[i])
+        
+        h1_prime = math.degrees(math.atan2(b1[i], a1_prime) % (2.0 * math.pi))
+        h2_prime = math.degrees(math.atan2(b2[i], a2_prime) % (2.0 * math.pi))
+        
+        dL_prime = L2[i] - L1[i]
+        dC_prime = C2_prime - C1_prime
+        
+        C_prod = C1_prime * C2_prime
+        dh = h2_prime - h1_prime
+        if C_prod == 0.0:
+            dh_prime = 0.0
+        elif abs(dh) <= 180.0:
+            dh_prime = dh
+        elif dh > 180.0:
+            dh_prime = dh - 360.0
+        else:
+            dh_prime = dh + 360.0
+        dH_prime = 2.0 * math.sqrt(C_prod) * math.sin(math.radians(dh_prime / 2.0))
+        
+        L_bar_prime = (L1[i] + L2[i]) / 2.0
+        C_bar_prime = (C1_prime + C2_prime) / 2.0
+        
+        h_sum = h1_prime + h2_prime
+        if C_prod == 0.0:
+            h_bar_prime = h_sum
+        elif abs(h1_prime - h2_prime) <= 180.0:
+            h_bar_prime = h_sum / 2.0
+        elif h_sum < 360.0:
+            h_bar_prime = (h_sum + 360.0) / 2.0
+        else:
+            h_bar_prime = (h_sum - 360.0) / 2.0
+        
+        T = (1.0 - 0.17 * math.cos(math.radians(h_bar_prime - 30.0)) +
+             0.24 * math.cos(math.radians(2.0 * h_bar_prime)) +
+             0.32 * math.cos(math.radians(3.0 * h_bar_prime + 6.0)) -
+             0.20 * math.cos(math.radians(4.0 * h_bar_prime - 63.0)))
+        
+        L50_sq = (L_bar_prime - 50.0) ** 2
+        SL = 1.0 + (0.015 * L50_sq) / math.sqrt(20.0 + L50_sq)
+        SC = 1.0 + 0.045 * C_bar_prime
+        SH = 1.0 + 0.015 * C_bar_prime * T
+        
+        dTheta = 30.0 * math.exp(-((h_bar_prime - 275.0) / 25.0) ** 2)
+        C_bar_prime7 = (C_bar_prime * C_bar_prime * C_bar_prime * C_bar_prime *
+                        C_bar_prime * C_bar_prime * C_bar_prime)
+        RC = 2.0 * math.sqrt(C_bar_prime7 / (C_bar_prime7 + _POW25_7))
+        RT = -math.sin(math.radians(2.0 * dTheta)) * RC
+        
+        dL_term = dL_prime / SL
+        dC_term = dC_prime / SC
+        dH_term = dH_prime / SH
+        out[i] = math.sqrt(
+            dL_term * dL_term + dC_term * dC_term + dH_term * dH_term +
+            RT * dC_term * dH_term
+        )
+    return out
+
+
+def _as_lab32(lab1: np.ndarray, lab2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Cast LAB inputs to float32 (no copy for arrays from _rgb_to_lab)."""
+    return np.asarray(lab1, dtype=np.float32), np.asarray(lab2, dtype=np.float32)
+
 
 class DeltaECalculator:
     """Calculate color differences using various Delta E formulas.
     
     Implements CIE76, CIE94, and CIEDE2000 color difference calculations.
+    All conversions and formulas operate on the last axis, so they accept
+    a single color (3,) as well as a batch of colors (N, 3). Everything runs
+    in float32 to keep batched LAB arrays at half the size of float64.
     """
     
     def __init__(self, method: str = 'ciede2000'):
@@ -16,8 +113,21 @@ class DeltaECalculator:
         
         Args:
             method: Calculation method ('cie76', 'cie94', 'ciede2000')
+        
+        Raises:
+            ValueError: If method is not one of the supported formulas
         """
         self.method = method.lower()
+        
+        # Resolve the formula once instead of string-matching on every call
+        methods = {
+            'cie76': self._delta_e_76,
+            'cie94': self._delta_e_94,
+            'ciede2000': self._delta_e_2000,
+        }
+        if self.method not in methods:
+            raise ValueError(f"Unknown method: {self.method}")
+        self._fn = methods[self.method]
     
     def calculate(self, color1: np.ndarray, color2: np.ndarray) -> float:
         """Calculate Delta E between two colors.
@@ -33,14 +143,41 @@ class DeltaECalculator:
         lab1 = self._rgb_to_lab(color1)
         lab2 = self._rgb_to_lab(color2)
         
-        if self.method == 'cie76':
-            return self._delta_e_76(lab1, lab2)
-        elif self.method == 'cie94':
-            return self._delta_e_94(lab1, lab2)
-        elif self.method == 'ciede2000':
-            return self._delta_e_2000(lab1, lab2)
-        else:
-            raise ValueError(f"Unknown method: {self.method}")
+        return float(self._fn(lab1, lab2))
+    
+    def calculate_batch(self, colors1: np.ndarray, colors2: np.ndarray) -> np.ndarray:
+        """Calculate Delta E between two sets of colors, pairwise.
+        
+        Args:
+            colors1: First colors in RGB format (0-255), shape (N, 3)
+            colors2: Second colors in RGB format (0-255), shape (N, 3)
+        
+        Returns:
+            Delta E value per pair, shape (N,)
+        """
+        lab1 = self._rgb_to_lab(colors1)
+        lab2 = self._rgb_to_lab(colors2)
+        
+        return self._fn(lab1, lab2)
+    
+    def calculate_from_lab(self, colors: np.ndarray, reference_lab: np.ndarray) -> np.ndarray:
+        """Calculate Delta E against reference colors already in LAB.
+        
+        For fixed references (e.g. a color chart), convert them once with
+        to_lab() so only the measured colors are converted per call.
+        
+        Args:
+            colors: Measured colors in RGB format (0-255), shape (N, 3)
+            reference_lab: Reference colors in LAB, shape (N, 3)
+        
+        Returns:
+            Delta E value per pair, shape (N,)
+        """
+        return self._fn(self._rgb_to_lab(colors), reference_lab)
+    
+    def to_lab(self, rgb: np.ndarray) -> np.ndarray:
+        """Convert RGB color(s) (0-255) to the float32 LAB used by the formulas."""
+        return self._rgb_to_lab(rgb)
     
     def calculate_average(
         self,
@@ -59,98 +196,71 @@ class DeltaECalculator:
         if image1.shape != image2.shape:
             raise ValueError("Images must have same dimensions")
         
-        # Calculate per-pixel Delta E
+        # Sample every Nth pixel for efficiency
         h, w = image1.shape[:2]
-        delta_e_sum = 0.0
-        
-        # Sample every 10th pixel for efficiency
         sample_step = max(1, min(h, w) // 100)
-        count = 0
         
-        for i in range(0, h, sample_step):
-            for j in range(0, w, sample_step):
-                de = self.calculate(image1[i, j], image2[i, j])
-                delta_e_sum += de
-                count += 1
+        # Flatten the sampled grid to (N, 3) and evaluate all pixels at once
+        pixels1 = image1[::sample_step, ::sample_step].reshape(-1, 3)
+        pixels2 = image2[::sample_step, ::sample_step].reshape(-1, 3)
+        
+        if pixels1.shape[0] == 0:
+            return 0.0
+        
+        lab1 = self._rgb_to_lab(pixels1)
+        lab2 = self._rgb_to_lab(pixels2)
         
-        return delta_e_sum / count if count > 0 else 0.0
+        return float(np.mean(self._fn(lab1, lab2)))
     
     def _rgb_to_lab(self, rgb: np.ndarray) -> np.ndarray:
         """Convert RGB to CIELAB color space.
         
         Args:
-            rgb: RGB color (0-255)
+            rgb: RGB color(s) (0-255), shape (..., 3)
         
         Returns:
-            LAB color (L: 0-100, a/b: -128 to 127)
+            LAB color(s) (L: 0-100, a/b: -128 to 127), shape (..., 3)
         """
-        # Normalize RGB
-        rgb_norm = rgb.astype(np.float32) / 255.0
-        
-        # sRGB to linear RGB
-        def srgb_to_linear(c):
-            return np.where(
-                c <= 0.04045,
-                c / 12.92,
-                ((c + 0.055) / 1.055) ** 2.4
-            )
-        
-        r, g, b = srgb_to_linear(rgb_norm[0]), srgb_to_linear(rgb_norm[1]), srgb_to_linear(rgb_norm[2])
-        
-        # RGB to XYZ (D65 illuminant)
-        x = r * 0.4124564 + g * 0.3575761 + b * 0.1804375
-        y = r * 0.2126729 + g * 0.7151522 + b * 0.0721750
-        z = r * 0.0193339 + g * 0.1191920 + b * 0.9503041
-        
-        # Normalize by D65 white point
-        x = x / 0.95047
-        y = y / 1.00000
-        z = z / 1.08883
-        
-        # XYZ to LAB
-        def f(t):
-            delta = 6.0 / 29.0
-            return np.where(
-                t > delta ** 3,
-                t ** (1.0 / 3.0),
-                t / (3 * delta ** 2) + (4.0 / 29.0)
-            )
-        
-        fx = f(x)
-        fy = f(y)
-        fz = f(z)
-        
-        L = 116.0 * fy - 16.0
-        a = 500.0 * (fx - fy)
-        b_val = 200.0 * (fy - fz)
+        # Decode gamma ourselves (8-bit input via LUT) and let OpenCV do the
+        # linear RGB -> LAB step; its built-in float sRGB curve is approximate
+        rgb_arr = np.asarray(rgb)
+        if rgb_arr.dtype == np.uint8:
+            linear = cv2.LUT(rgb_arr.reshape(-1, 1, 3), _SRGB_LIN_LUT)
+        else:
+            rgb_arr = rgb_arr.astype(np.float32, copy=False)
+            linear = _srgb_to_linear(rgb_arr / np.float32(255.0)).astype(np.float32, copy=False)
+            linear = linear.reshape(-1, 1, 3)
+        lab = cv2.cvtColor(linear, cv2.COLOR_LRGB2LAB)
         
-        return np.array([L, a, b_val], dtype=np.float32)
+        return lab.reshape(rgb_arr.shape)
     
-    def _delta_e_76(self, lab1: np.ndarray, lab2: np.ndarray) -> float:
+    def _delta_e_76(self, lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
         """Calculate CIE76 Delta E (simple Euclidean distance).
         
         Args:
-            lab1: First LAB color
-            lab2: Second LAB color
+            lab1: First LAB color(s)
+            lab2: Second LAB color(s)
         
         Returns:
-            Delta E value
+            Delta E value(s)
         """
+        lab1, lab2 = _as_lab32(lab1, lab2)
         diff = lab1 - lab2
-        return float(np.sqrt(np.sum(diff ** 2)))
+        return np.sqrt(np.sum(diff ** 2, axis=-1))
     
-    def _delta_e_94(self, lab1: np.ndarray, lab2: np.ndarray) -> float:
+    def _delta_e_94(self, lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
         """Calculate CIE94 Delta E.
         
         Args:
-            lab1: First LAB color
-            lab2: Second LAB color
+            lab1: First LAB color(s)
+            lab2: Second LAB color(s)
         
         Returns:
-            Delta E value
+            Delta E value(s)
         """
-        L1, a1, b1 = lab1
-        L2, a2, b2 = lab2
+        lab1, lab2 = _as_lab32(lab1, lab2)
+        L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+        L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
         
         dL = L1 - L2
         C1 = np.sqrt(a1**2 + b1**2)
@@ -158,7 +268,7 @@ class DeltaECalculator:
         dC = C1 - C2
         da = a1 - a2
         db = b1 - b2
-        dH = np.sqrt(max(0, da**2 + db**2 - dC**2))
+        dH = np.sqrt(np.maximum(0, da**2 + db**2 - dC**2))
         
         # Weighting factors for graphic arts
         kL = 1.0
@@ -175,20 +285,30 @@ class DeltaECalculator:
             (dH / SH)**2
         )
         
-        return float(dE94)
+        return dE94
     
-    def _delta_e_2000(self, lab1: np.ndarray, lab2: np.ndarray) -> float:
+    def _delta_e_2000(self, lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
         """Calculate CIEDE2000 Delta E (most perceptually uniform).
         
         Args:
-            lab1: First LAB color
-            lab2: Second LAB color
+            lab1: First LAB color(s)
+            lab2: Second LAB color(s)
         
         Returns:
-            Delta E 2000 value
+            Delta E 2000 value(s)
         """
-        L1, a1, b1 = lab1
-        L2, a2, b2 = lab2
+        lab1, lab2 = _as_lab32(lab1, lab2)
+        if NUMBA_AVAILABLE:
+            flat1 = lab1.reshape(-1, 3)
+            flat2 = lab2.reshape(-1, 3)
+            dE00 = _de2000_kernel(
+                flat1[:, 0], flat1[:, 1], flat1[:, 2],
+                flat2[:, 0], flat2[:, 1], flat2[:, 2]
+            )
+            return dE00.reshape(lab1.shape[:-1])
+        
+        L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+        L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
         
         # Calculate C and h
         C1 = np.sqrt(a1**2 + b1**2)
@@ -197,7 +317,8 @@ class DeltaECalculator:
         C_bar = (C1 + C2) / 2.0
         
         # Calculate G
-        G = 0.5 * (1 - np.sqrt(C_bar**7 / (C_bar**7 + 25**7)))
+        C_bar7 = C_bar**7
+        G = 0.5 * (1 - np.sqrt(C_bar7 / (C_bar7 + _POW25_7)))
         
         # Calculate a'
         a1_prime = (1 + G) * a1
@@ -220,14 +341,15 @@ class DeltaECalculator:
         dC_prime = C2_prime - C1_prime
         
         # Calculate dh'
-        if C1_prime * C2_prime == 0:
-            dh_prime = 0
-        elif np.abs(h2_prime - h1_prime) <= 180:
-            dh_prime = h2_prime - h1_prime
-        elif h2_prime - h1_prime > 180:
-            dh_prime = h2_prime - h1_prime - 360
-        else:
-            dh_prime = h2_prime - h1_prime + 360
+        C_prod_zero = C1_prime * C2_prime == 0
+        dh = h2_prime - h1_prime
+        dh_prime = np.where(
+            C_prod_zero, 0.0,
+            np.where(
+                np.abs(dh) <= 180, dh,
+                np.where(dh > 180, dh - 360, dh + 360)
+            )
+        )
         
         # Calculate dH'
         dH_prime = 2 * np.sqrt(C1_prime * C2_prime) * np.sin(np.radians(dh_prime / 2))
@@ -237,14 +359,14 @@ class DeltaECalculator:
         C_bar_prime = (C1_prime + C2_prime) / 2.0
         
         # Calculate h_bar'
-        if C1_prime * C2_prime == 0:
-            h_bar_prime = h1_prime + h2_prime
-        elif np.abs(h1_prime - h2_prime) <= 180:
-            h_bar_prime = (h1_prime + h2_prime) / 2.0
-        elif h1_prime + h2_prime < 360:
-            h_bar_prime = (h1_prime + h2_prime + 360) / 2.0
-        else:
-            h_bar_prime = (h1_prime + h2_prime - 360) / 2.0
+        h_sum = h1_prime + h2_prime
+        h_bar_prime = np.where(
+            C_prod_zero, h_sum,
+            np.where(
+                np.abs(h1_prime - h2_prime) <= 180, h_sum / 2.0,
+                np.where(h_sum < 360, (h_sum + 360) / 2.0, (h_sum - 360) / 2.0)
+            )
+        )
         
         # Calculate T
         T = (1 - 0.17 * np.cos(np.radians(h_bar_prime - 30)) +
@@ -259,7 +381,8 @@ class DeltaECalculator:
         
         # Calculate RT
         dTheta = 30 * np.exp(-((h_bar_prime - 275) / 25)**2)
-        RC = 2 * np.sqrt(C_bar_prime**7 / (C_bar_prime**7 + 25**7))
+        C_bar_prime7 = C_bar_prime**7
+        RC = 2 * np.sqrt(C_bar_prime7 / (C_bar_prime7 + _POW25_7))
         RT = -np.sin(np.radians(2 * dTheta)) * RC
         
         # Calculate final Delta E
@@ -272,4 +395,4 @@ class DeltaECalculator:
             RT * (dC_prime / (kC * SC)) * (dH_prime / (kH * SH))
         )
         
-        return float(dE00)
+        return dE00
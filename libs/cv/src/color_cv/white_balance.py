@@ -5,6 +5,39 @@ import cv2
 from typing import Optional, Tuple
 from enum import Enum
 
+from ._jit import NUMBA_AVAILABLE
+from ._wb_kernels import apply_gains_u8
+
+
+def _percentile_u8(image: np.ndarray, q: float) -> np.ndarray:
+    """Per-channel percentile of a uint8 image from 256-bin histograms.
+    
+    Matches np.percentile (linear interpolation) exactly, but needs a single
+    O(N) histogram pass per channel instead of a partial sort.
+    
+    Args:
+        image: uint8 image, shape (H, W, C)
+        q: Percentile in [0, 100]
+        
+    Returns:
+        Array of C percentile values
+    """
+    image = np.ascontiguousarray(image)
+    n = image.shape[0] * image.shape[1]
+    hists = np.stack([
+        cv2.calcHist([image], [c], None, [256], [0, 256]).ravel()
+        for c in range(image.shape[2])
+    ])
+    cum = hists.cumsum(axis=1)
+    
+    # Sorted-order rank of the percentile and its two neighbouring values
+    rank = q / 100.0 * (n - 1)
+    lo = np.floor(rank)
+    v_lo = (cum <= lo).sum(axis=1)
+    v_hi = (cum <= min(lo + 1, n - 1)).sum(axis=1)
+    
+    return v_lo + (v_hi - v_lo) * (rank - lo)
+
 
 class WhiteBalanceMethod(Enum):
     """Available white balance methods."""
@@ -18,6 +51,9 @@ class WhiteBalancer:
     
     Attributes:
         method: Selected white balance method
+    
+    Instances keep a float32 scratch buffer between calls, so share one
+    WhiteBalancer per thread rather than across threads.
     """
     
     def __init__(self, method: str = 'gray_world'):
@@ -27,6 +63,16 @@ class WhiteBalancer:
             method: White balance method ('gray_world', 'white_patch', 'learning_based')
         """
         self.method = WhiteBalanceMethod(method)
+        
+        # Bind the algorithm once; all take (image, reference=None)
+        self._fn = {
+            WhiteBalanceMethod.GRAY_WORLD: self._gray_world,
+            WhiteBalanceMethod.WHITE_PATCH: self._white_patch,
+            WhiteBalanceMethod.LEARNING_BASED: self._learning_based,
+        }[self.method]
+        
+        # Reused float32 work buffer for the NumPy gain path (resized on demand)
+        self._scratch_f32: Optional[np.ndarray] = None
     
     def balance(self, image: np.ndarray, reference: Optional[np.ndarray] = None) -> np.ndarray:
         """Apply white balance to image.
@@ -38,86 +84,54 @@ class WhiteBalancer:
         Returns:
             White balanced image
         """
-        if self.method == WhiteBalanceMethod.GRAY_WORLD:
-            return self._gray_world(image)
-        elif self.method == WhiteBalanceMethod.WHITE_PATCH:
-            return self._white_patch(image)
-        elif self.method == WhiteBalanceMethod.LEARNING_BASED:
-            return self._learning_based(image, reference)
-        else:
-            raise ValueError(f"Unknown method: {self.method}")
+        return self._fn(image, reference)
     
-    def _gray_world(self, image: np.ndarray) -> np.ndarray:
+    def _gray_world(self, image: np.ndarray, reference: Optional[np.ndarray] = None) -> np.ndarray:
         """Gray world white balance assumption.
         
         Assumes average color in image should be gray.
         
         Args:
             image: Input RGB image
+            reference: Unused; accepted for a uniform dispatch signature
             
         Returns:
             Balanced image
         """
-        # Convert to float
-        img_float = image.astype(np.float32)
-        
-        # Calculate average for each channel
-        avg_r = np.mean(img_float[:, :, 0])
-        avg_g = np.mean(img_float[:, :, 1])
-        avg_b = np.mean(img_float[:, :, 2])
+        # Per-channel averages in a single pass over the uint8 image
+        avgs = np.array(cv2.mean(image)[:3])
         
         # Calculate gray (average of all channels)
-        gray = (avg_r + avg_g + avg_b) / 3.0
-        
-        # Calculate scaling factors
-        scale_r = gray / avg_r if avg_r > 0 else 1.0
-        scale_g = gray / avg_g if avg_g > 0 else 1.0
-        scale_b = gray / avg_b if avg_b > 0 else 1.0
-        
-        # Apply scaling
-        balanced = img_float.copy()
-        balanced[:, :, 0] *= scale_r
-        balanced[:, :, 1] *= scale_g
-        balanced[:, :, 2] *= scale_b
+        gray = avgs.mean()
         
-        # Clip and convert back
-        balanced = np.clip(balanced, 0, 255).astype(np.uint8)
+        # Calculate scaling factors (1.0 for empty channels)
+        scales = np.divide(gray, avgs, out=np.ones(3, np.float32), where=avgs > 0)
         
-        return balanced
+        return self._apply_gains(image, scales)
     
-    def _white_patch(self, image: np.ndarray) -> np.ndarray:
+    def _white_patch(self, image: np.ndarray, reference: Optional[np.ndarray] = None) -> np.ndarray:
         """White patch (max RGB) white balance.
         
         Assumes brightest point in image should be white.
         
         Args:
             image: Input RGB image
+            reference: Unused; accepted for a uniform dispatch signature
             
         Returns:
             Balanced image
         """
-        img_float = image.astype(np.float32)
-        
         # Find maximum values for each channel
-        max_r = np.percentile(img_float[:, :, 0], 99)  # Use 99th percentile to avoid outliers
-        max_g = np.percentile(img_float[:, :, 1], 99)
-        max_b = np.percentile(img_float[:, :, 2], 99)
-        
-        # Calculate scaling factors
-        scale_r = 255.0 / max_r if max_r > 0 else 1.0
-        scale_g = 255.0 / max_g if max_g > 0 else 1.0
-        scale_b = 255.0 / max_b if max_b > 0 else 1.0
-        
-        # Apply scaling
-        balanced = img_float.copy()
-        balanced[:, :, 0] *= scale_r
-        balanced[:, :, 1] *= scale_g
-        balanced[:, :, 2] *= scale_b
+        # Use 99th percentile to avoid outliers
+        if image.dtype == np.uint8:
+            maxs = _percentile_u8(image, 99)
+        else:
+            maxs = np.percentile(image.astype(np.float32), 99, axis=(0, 1))
         
-        # Clip and convert
-        balanced = np.clip(balanced, 0, 255).astype(np.uint8)
+        # Calculate scaling factors (1.0 for empty channels)
+        scales = np.divide(255.0, maxs[:3], out=np.ones(3, np.float32), where=maxs[:3] > 0)
         
-        return balanced
+        return self._apply_gains(image, scales)
     
     def _learning_based(self, image: np.ndarray, reference: Optional[np.ndarray] = None) -> np.ndarray:
         """Learning-based white balance using reference patch.
@@ -135,28 +149,54 @@ class WhiteBalancer:
             # Fall back to gray world if no reference
             return self._gray_world(image)
         
-        # Calculate average color of reference patch
-        ref_avg = np.mean(reference, axis=(0, 1))
+        # Per-channel median of the reference patch: robust to speckle,
+        # dust and specular pixels on the gray card
+        ref_avg = np.median(reference.reshape(-1, reference.shape[-1]), axis=0).astype(np.float32)
         
         # Expected gray value (mid-gray = 128)
         target_gray = 128.0
         
-        # Calculate gains
-        gain_r = target_gray / ref_avg[0] if ref_avg[0] > 0 else 1.0
-        gain_g = target_gray / ref_avg[1] if ref_avg[1] > 0 else 1.0
-        gain_b = target_gray / ref_avg[2] if ref_avg[2] > 0 else 1.0
+        # Calculate gains (1.0 for empty channels)
+        gains = np.divide(target_gray, ref_avg[:3], out=np.ones(3, np.float32), where=ref_avg[:3] > 0)
         
-        # Apply gains
-        img_float = image.astype(np.float32)
-        balanced = img_float.copy()
-        balanced[:, :, 0] *= gain_r
-        balanced[:, :, 1] *= gain_g
-        balanced[:, :, 2] *= gain_b
-        
-        # Clip and convert
-        balanced = np.clip(balanced, 0, 255).astype(np.uint8)
+        return self._apply_gains(image, gains)
+    
+    def _apply_gains(self, image: np.ndarray, gains: np.ndarray) -> np.ndarray:
+        """Scale each channel by its gain and convert back to uint8.
         
-        return balanced
+        Args:
+            image: Input RGB image
+            gains: Per-channel (R, G, B) float32 gains
+            
+        Returns:
+            Scaled image, rounded and clipped to 0-255
+        """
+        if image.ndim == 3 and image.shape[2] > 3:
+            # Gains apply to the color channels; alpha is copied through
+            balanced = np.empty(image.shape, dtype=np.uint8)
+            balanced[..., :3] = self._apply_gains(np.ascontiguousarray(image[..., :3]), gains)
+            balanced[..., 3:] = np.clip(image[..., 3:], 0, 255)
+            return balanced
+        
+        if image.dtype == np.uint8 and image.ndim == 3 and image.shape[2] == 3:
+            if NUMBA_AVAILABLE:
+                # Fused scale + saturate in a single pass over the image
+                return apply_gains_u8(image, gains, np.empty(image.shape, dtype=np.uint8))
+            
+            # One SIMD multiply over the interleaved pixels with saturate_cast
+            return cv2.multiply(image, (float(gains[0]), float(gains[1]), float(gains[2]), 0.0))
+        
+        # Scale and clip in the reused scratch buffer; only the uint8 result
+        # is allocated per call so earlier results are never overwritten
+        if self._scratch_f32 is None or self._scratch_f32.shape != image.shape:
+            self._scratch_f32 = np.empty(image.shape, dtype=np.float32)
+        balanced = self._scratch_f32
+        # The cast to float happens inside the multiply, no separate copy pass
+        np.multiply(image, gains, out=balanced, casting='unsafe')
+        np.clip(balanced, 0, 255, out=balanced)
+        np.rint(balanced, out=balanced)
+        
+        return balanced.astype(np.uint8)
     
     def estimate_illuminant(self, image: np.ndarray) -> Tuple[float, float, float]:
         """Estimate scene illuminant color.
@@ -167,16 +207,15 @@ class WhiteBalancer:
         Returns:
             Tuple of (R, G, B) illuminant estimates
         """
-        img_float = image.astype(np.float32)
-        
-        if self.method == WhiteBalanceMethod.GRAY_WORLD:
-            # Illuminant is average color
-            return tuple(np.mean(img_float, axis=(0, 1)))
-        
-        elif self.method == WhiteBalanceMethod.WHITE_PATCH:
+        # Reduce the input directly; no float32 copy of the whole image
+        if self.method == WhiteBalanceMethod.WHITE_PATCH:
             # Illuminant is brightest color
-            return tuple(np.percentile(img_float, 99, axis=(0, 1)))
-        
+            if image.dtype == np.uint8:
+                illuminant = _percentile_u8(image, 99)
+            else:
+                illuminant = np.percentile(image, 99, axis=(0, 1))
         else:
-            # Default to gray world
-            return tuple(np.mean(img_float, axis=(0, 1)))
+            # Illuminant is average color (also the default)
+            illuminant = cv2.mean(image)[:3]
+        
+        return tuple(float(v) for v in illuminant[:3])
@@ -0,0 +1,63 @@
+"""Tests that ColorCorrectionMatrix.apply_batch matches apply()."""
+import numpy as np
+import pytest
+
+from color_cv.ccm import ColorCorrectionMatrix
+
+
+@pytest.fixture
+def ccm():
+    """A matrix that both over- and undershoots the uint8 range."""
+    ccm = ColorCorrectionMatrix()
+    ccm.set_matrix(np.array([
+        [1.4, -0.3, -0.1],
+        [-0.2, 1.3, -0.1],
+        [0.05, -0.45, 1.4],
+    ]))
+    return ccm
+
+
+@pytest.fixture
+def frames():
+    """A stack of random RGB frames."""
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(4, 24, 32, 3), dtype=np.uint8)
+
+
+class TestApplyBatch:
+    """Test apply_batch against per-frame apply()."""
+
+    def test_uint8_frames(self, ccm, frames):
+        """Test that a uint8 stack matches frame-by-frame correction."""
+        expected = np.stack([ccm.apply(frame) for frame in frames])
+
+        np.testing.assert_array_equal(ccm.apply_batch(frames), expected)
+
+    def test_float32_frames(self, ccm, frames):
+        """Test that float32 input is clipped to uint8 like apply()."""
+        frames = frames.astype(np.float32) + 0.25
+        expected = np.stack([ccm.apply(frame) for frame in frames])
+
+        np.testing.assert_array_equal(ccm.apply_batch(frames), expected)
+
+    def test_in_place(self, ccm, frames):
+        """Test that out=frames corrects a uint8 stack in place."""
+        expected = np.stack([ccm.apply(frame) for frame in frames])
+
+        result = ccm.apply_batch(frames, out=frames)
+
+        assert result is frames
+        np.testing.assert_array_equal(frames, expected)
+
+    def test_non_contiguous_frames(self, ccm, frames):
+        """Test that a strided view of frames is handled."""
+        view = frames[::2]
+        expected = np.stack([ccm.apply(frame) for frame in view])
+
+        np.testing.assert_array_equal(ccm.apply_batch(view), expected)
+
+    @pytest.mark.parametrize("shape", [(24, 32, 3), (4, 24, 32, 4)])
+    def test_rejects_bad_shape(self, ccm, shape):
+        """Test that anything but an (N, H, W, 3) stack is rejected."""
+        with pytest.raises(ValueError):
+            ccm.apply_batch(np.zeros(shape, dtype=np.uint8))
@@ -0,0 +1,64 @@
+"""Tests that the batched Delta E paths match the per-color calculation."""
+import numpy as np
+import pytest
+
+from color_cv.delta_e import DeltaECalculator
+
+
+METHODS = ["cie76", "cie94", "ciede2000"]
+
+
+@pytest.fixture
+def colors():
+    """Pairs of RGB colors, including black, white and near-neutral grays."""
+    rng = np.random.default_rng(0)
+    colors1 = rng.integers(0, 256, size=(64, 3)).astype(np.float32)
+    colors2 = rng.integers(0, 256, size=(64, 3)).astype(np.float32)
+    colors1[:4] = [[0, 0, 0], [255, 255, 255], [128, 128, 128], [128, 128, 129]]
+    colors2[:4] = [[0, 0, 0], [254, 255, 255], [128, 128, 128], [128, 129, 128]]
+    return colors1, colors2
+
+
+def _scalar(calc, colors1, colors2):
+    return np.array([calc.calculate(c1, c2) for c1, c2 in zip(colors1, colors2)])
+
+
+@pytest.mark.parametrize("method", METHODS)
+class TestBatchEquivalence:
+    """Test the batched calculations against calculate()."""
+
+    def test_calculate_batch(self, method, colors):
+        """Test that calculate_batch matches calculate pair by pair."""
+        calc = DeltaECalculator(method)
+
+        np.testing.assert_allclose(
+            calc.calculate_batch(*colors), _scalar(calc, *colors), rtol=1e-5, atol=1e-4
+        )
+
+    def test_calculate_from_lab(self, method, colors):
+        """Test that precomputed reference LAB values give the same result."""
+        calc = DeltaECalculator(method)
+        colors1, colors2 = colors
+
+        np.testing.assert_allclose(
+            calc.calculate_from_lab(colors1, calc.to_lab(colors2)),
+            _scalar(calc, colors1, colors2),
+            rtol=1e-5,
+            atol=1e-4,
+        )
+
+    def test_to_lab_matches_per_color(self, method, colors):
+        """Test that converting a batch equals converting each color."""
+        calc = DeltaECalculator(method)
+        colors1, _ = colors
+
+        np.testing.assert_allclose(
+            calc.to_lab(colors1), np.stack([calc.to_lab(c) for c in colors1]), rtol=1e-6, atol=1e-4
+        )
+
+    def test_identical_colors(self, method, colors):
+        """Test that a color has no difference from itself."""
+        calc = DeltaECalculator(method)
+        colors1, _ = colors
+
+        np.testing.assert_allclose(calc.calculate_batch(colors1, colors1), 0.0, atol=1e-4)
@@ -0,0 +1,42 @@
+"""Tests for WhiteBalancer on RGB and RGBA input."""
+import numpy as np
+import pytest
+
+from color_cv.white_balance import WhiteBalancer
+
+
+METHODS = ["gray_world", "white_patch", "learning_based"]
+
+
+@pytest.fixture
+def rgba():
+    """A random RGBA image."""
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(32, 32, 4), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("method", METHODS)
+class TestRGBA:
+    """Test that a 4-channel image is balanced like its RGB channels."""
+
+    def test_uint8(self, method, rgba):
+        """Test that color channels match the RGB result and alpha is kept."""
+        reference = rgba[:8, :8]
+
+        balanced = WhiteBalancer(method).balance(rgba, reference)
+        expected = WhiteBalancer(method).balance(np.ascontiguousarray(rgba[..., :3]), reference[..., :3])
+
+        assert balanced.shape == rgba.shape
+        assert balanced.dtype == np.uint8
+        np.testing.assert_array_equal(balanced[..., :3], expected)
+        np.testing.assert_array_equal(balanced[..., 3], rgba[..., 3])
+
+    def test_float32(self, method, rgba):
+        """Test that float input is handled the same way."""
+        image = rgba.astype(np.float32)
+
+        balanced = WhiteBalancer(method).balance(image, image[:8, :8])
+        expected = WhiteBalancer(method).balance(np.ascontiguousarray(image[..., :3]), image[:8, :8, :3])
+
+        np.testing.assert_array_equal(balanced[..., :3], expected)
+        np.testing.assert_array_equal(balanced[..., 3], rgba[..., 3])
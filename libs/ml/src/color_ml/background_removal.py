@@ -7,68 +7,165 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ort = None
+    ONNXRUNTIME_AVAILABLE = False
+
+# ImageNet statistics the published U²-Net weights were trained with
+_U2NET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_U2NET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
 
 class BackgroundRemover:
-    """Remove background from images using U²-Net architecture."""
+    """Remove background from images using U²-Net architecture.
     
-    def __init__(self, model_path: Optional[str] = None):
+    Instances keep GrabCut work buffers between calls, so share one
+    BackgroundRemover per thread rather than across threads.
+    """
+    
+    def __init__(self, model_path: Optional[str] = None, input_size: int = 320):
         """Initialize background remover.
         
         Args:
-            model_path: Path to pre-trained model weights
+            model_path: Path to pre-trained U²-Net ONNX model
+            input_size: Square input resolution used when the model's input
+                        shape is dynamic
         """
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.model = None
+        self.input_size = input_size
+        self._input_name = None
+        self._input_wh = (input_size, input_size)
+        
+        # GrabCut work buffers, reused across calls (mask resized on demand)
+        self._bgd_model = np.zeros((1, 65), np.float64)
+        self._fgd_model = np.zeros((1, 65), np.float64)
+        self._mask_scratch: Optional[np.ndarray] = None
+        
         if model_path:
             self.load_model(model_path)
     
     def load_model(self, model_path: str):
-        """Load pre-trained model weights.
+        """Load a U²-Net ONNX model into an ONNX Runtime session.
+        
+        The session, its input name and input resolution are cached on the
+        instance, so remove() only runs inference. CUDA is used when torch
+        sees a GPU and onnxruntime-gpu is installed, otherwise the CPU.
         
         Args:
             model_path: Path to model file
         """
-        # Placeholder for actual model loading
-        # In production, load U²-Net or similar segmentation model
-        pass
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("onnxruntime is required to load U²-Net models")
+        
+        providers = ['CPUExecutionProvider']
+        if self.device.type == 'cuda' and 'CUDAExecutionProvider' in ort.get_available_providers():
+            providers.insert(0, 'CUDAExecutionProvider')
+        
+        self.model = ort.InferenceSession(model_path, providers=providers)
+        model_input = self.model.get_inputs()[0]
+        self._input_name = model_input.name
+        
+        # NCHW; symbolic (dynamic) dimensions are strings or None
+        height, width = model_input.shape[2:4]
+        if isinstance(height, int) and isinstance(width, int):
+            self._input_wh = (width, height)
+        else:
+            self._input_wh = (self.input_size, self.input_size)
     
     def remove(self, image: np.ndarray) -> np.ndarray:
         """Remove background from image.
         
+        Uses the loaded U²-Net model, or GrabCut when no model is loaded.
+        
         Args:
             image: Input RGB image
             
         Returns:
             Image with background removed (transparent or white)
         """
-        # Simple implementation using GrabCut
-        # In production, use deep learning model
-        return self._grabcut_removal(image)
+        if self.model is None:
+            return self._grabcut_removal(image)
+        return self._u2net_removal(image)
+    
+    def _u2net_removal(self, image: np.ndarray) -> np.ndarray:
+        """Background removal with the U²-Net saliency map.
+        
+        Args:
+            image: Input RGB image
+            
+        Returns:
+            Image scaled by the predicted foreground probability
+        """
+        h, w = image.shape[:2]
+        
+        # Resize first so normalisation only touches the model-sized copy
+        small = cv2.resize(image, self._input_wh, interpolation=cv2.INTER_AREA).astype(np.float32)
+        small *= 1.0 / max(float(small.max()), 1e-6)
+        small -= _U2NET_MEAN
+        small /= _U2NET_STD
+        x = np.ascontiguousarray(small.transpose(2, 0, 1)[np.newaxis])
+        
+        # First output (d0) is the fused saliency map, shape (1, 1, H, W)
+        pred = self.model.run(None, {self._input_name: x})[0][0, 0]
+        pred_min, pred_max = float(pred.min()), float(pred.max())
+        mask_small = (pred - pred_min) / max(pred_max - pred_min, 1e-6)
+        
+        mask = cv2.resize(mask_small.astype(np.float32), (w, h), interpolation=cv2.INTER_LINEAR)
+        result = image * mask[:, :, np.newaxis]
+        
+        return result.astype(np.uint8)
     
-    def _grabcut_removal(self, image: np.ndarray) -> np.ndarray:
+    def _grabcut_removal(self, image: np.ndarray, work_size: int = 512) -> np.ndarray:
         """Simple background removal using GrabCut algorithm.
         
+        GrabCut runs on a copy downscaled so its longest side is work_size;
+        the resulting mask is upsampled back to the input resolution.
+        
         Args:
             image: Input image
+            work_size: Longest side (px) of the image GrabCut operates on
             
         Returns:
             Image with background removed
         """
-        mask = np.zeros(image.shape[:2], np.uint8)
-        bgd_model = np.zeros((1, 65), np.float64)
-        fgd_model = np.zeros((1, 65), np.float64)
+        h, w = image.shape[:2]
+        scale = work_size / max(h, w)
+        if scale < 1.0:
+            work = cv2.resize(
+                image,
+                (max(1, round(w * scale)), max(1, round(h * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+        else:
+            work = image
+        
+        if self._mask_scratch is None or self._mask_scratch.shape != work.shape[:2]:
+            self._mask_scratch = np.zeros(work.shape[:2], np.uint8)
+        else:
+            self._mask_scratch.fill(0)
+        mask = self._mask_scratch
+        bgd_model = self._bgd_model
+        fgd_model = self._fgd_model
+        bgd_model.fill(0)
+        fgd_model.fill(0)
         
         # Initialize rectangle (assume subject in center)
-        h, w = image.shape[:2]
-        rect = (int(w*0.1), int(h*0.1), int(w*0.8), int(h*0.8))
+        wh, ww = work.shape[:2]
+        rect = (int(ww*0.1), int(wh*0.1), int(ww*0.8), int(wh*0.8))
         
         # Apply GrabCut
-        cv2.grabCut(image, mask, rect, bgd_model, fgd_model, 5, cv2.GC_INIT_WITH_RECT)
+        cv2.grabCut(work, mask, rect, bgd_model, fgd_model, 5, cv2.GC_INIT_WITH_RECT)
         
-        # Create mask
-        mask2 = np.where((mask == 2) | (mask == 0), 0, 1).astype('uint8')
+        # Foreground labels (GC_FGD=1, GC_PR_FGD=3) are the odd ones
+        mask2 = mask & 1
+        if work is not image:
+            mask2 = cv2.resize(mask2, (w, h), interpolation=cv2.INTER_NEAREST)
         
         # Apply mask
-        result = image * mask2[:, :, np.newaxis]
+        result = cv2.bitwise_and(image, image, mask=mask2)
         
         return result
@@ -0,0 +1,75 @@
+"""JSONB document columns and per-user listing indexes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15 00:00:00
+
+First revision. Brings databases created from earlier models up to date:
+
+- PostgreSQL: JSON document columns become jsonb (models.database.JSONDocument)
+- ix_jobs_user_status_created and ix_images_user_upload for per-user listings
+- PostgreSQL: jsonb_path_ops GIN index on jobs.image_ids for Job.has_image()
+
+Indexes use IF NOT EXISTS, so the revision also applies cleanly to
+databases whose tables were created from the current models.
+
+Only the models package is managed here (see env.py); the separate
+database.models mapping used by the jobs/results routers is not.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns declared as JSONDocument
+JSON_DOCUMENT_COLUMNS = (
+    ("jobs", "image_ids"),
+    ("jobs", "options"),
+    ("jobs", "error_messages"),
+    ("images", "ccm_matrix"),
+    ("images", "white_balance_gains"),
+    ("images", "delta_e_per_patch"),
+)
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    if _is_postgresql():
+        for table, column in JSON_DOCUMENT_COLUMNS:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE jsonb USING {column}::jsonb")
+    
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_jobs_user_status_created "
+        "ON jobs (user_id, status, created_at DESC)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_images_user_upload "
+        "ON images (user_id, upload_date DESC)"
+    )
+    
+    if _is_postgresql():
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_jobs_image_ids_gin "
+            "ON jobs USING gin (image_ids jsonb_path_ops)"
+        )
+
+
+def downgrade() -> None:
+    if _is_postgresql():
+        op.execute("DROP INDEX IF EXISTS ix_jobs_image_ids_gin")
+    
+    op.execute("DROP INDEX IF EXISTS ix_images_user_upload")
+    op.execute("DROP INDEX IF EXISTS ix_jobs_user_status_created")
+    
+    if _is_postgresql():
+        for table, column in JSON_DOCUMENT_COLUMNS:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE json USING {column}::json")
@@ -4,8 +4,10 @@ This module configures Celery for distributed task processing in the Color Corre
 Supports both Redis and RabbitMQ as message brokers.
 
 Usage:
-    # Start Celery worker
-    celery -A celery_config worker --loglevel=info
+    # Start Celery worker. Batch jobs publish to the per-operation queues
+    # (routers/batch.py), so a worker must consume them explicitly; GPU
+    # hosts can take only "correction"
+    celery -A celery_config worker --loglevel=info -Q default,processing,detection,correction
     
     # Start Celery flower monitoring
     celery -A celery_config flower
@@ -24,13 +26,19 @@ celery_app = Celery(
     "color_correction",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
+    # Register the worker's tasks (worker.process_image etc.) in every
+    # worker started with -A celery_config
+    include=["worker"],
 )
 
 # Configure Celery
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    # msgpack (built into kombu) encodes faster and smaller than stdlib json;
+    # json stays accepted for messages from older producers
+    task_serializer="msgpack",
+    accept_content=["msgpack", "json"],
+    result_serializer="msgpack",
+    result_accept_content=["msgpack", "json"],
     timezone="UTC",
     enable_utc=True,
     
@@ -56,6 +64,8 @@ celery_app.conf.update(
     # Task routing for different queues
     task_routes={
         'tasks.process_image': {'queue': 'processing'},
+        # Batch jobs override the queue per operation (routers/batch.py)
+        'worker.process_image': {'queue': 'processing'},
         'tasks.detect_markers': {'queue': 'detection'},
         'tasks.correct_colors': {'queue': 'correction'},
         'tasks.generate_report': {'queue': 'reporting'},
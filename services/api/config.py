@@ -1,8 +1,8 @@
 """Application Configuration Module.
 
 This module manages all configuration settings for the Color Correction System API.
-It uses Pydantic BaseSettings for type-safe environment variable management with
-validation and default values.
+It uses pydantic-settings BaseSettings (Pydantic v2) for type-safe environment
+variable management with validation and default values.
 
 Supports multiple environments:
 - Development (SQLite, debug mode)
@@ -16,8 +16,9 @@ Usage:
 """
 
 import os
-from typing import Optional, List
-from pydantic import BaseSettings, validator, Field
+from typing import FrozenSet, Optional
+from pydantic import Field, ValidationInfo, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
 
@@ -25,7 +26,7 @@ class Settings(BaseSettings):
     """Application settings with environment variable support.
     
     All settings can be overridden via environment variables.
-    Environment variables should be prefixed with APP_ (configurable via Config.env_prefix).
+    Environment variables should be prefixed with APP_ (configurable via model_config env_prefix).
     
     Attributes:
         APP_NAME: Application name
@@ -37,81 +38,85 @@ class Settings(BaseSettings):
         ACCESS_TOKEN_EXPIRE_MINUTES: Token expiration time
         DATABASE_URL: SQLAlchemy database connection string
         MAX_UPLOAD_SIZE: Maximum file upload size in bytes
-        ALLOWED_EXTENSIONS: List of allowed file extensions
+        ALLOWED_EXTENSIONS: Set of allowed file extensions
         CELERY_BROKER_URL: Redis/RabbitMQ URL for Celery
         CELERY_RESULT_BACKEND: Result backend for Celery tasks
-        CORS_ORIGINS: List of allowed CORS origins
+        REDIS_URL: Redis URL for shared state such as batch jobs
+        CORS_ORIGINS: Set of allowed CORS origins
         LOG_LEVEL: Logging level
     """
     
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False
+    )
+    
     # Application Settings
     APP_NAME: str = "Color Correction API"
     APP_VERSION: str = "1.0.0"
-    DEBUG: bool = Field(default=False, env="DEBUG")
-    ENVIRONMENT: str = Field(default="development", env="ENVIRONMENT")
+    DEBUG: bool = Field(default=False)
+    ENVIRONMENT: str = Field(default="development")
     
     # Security Settings
     SECRET_KEY: str = Field(
-        default="your-super-secret-key-change-this-in-production-please-use-openssl-rand-hex-32",
-        env="SECRET_KEY"
+        default="your-super-secret-key-change-this-in-production-please-use-openssl-rand-hex-32"
     )
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30)
     
     # Database Settings
     DATABASE_URL: str = Field(
-        default="sqlite:///./color_correction.db",
-        env="DATABASE_URL"
+        default="sqlite:///./color_correction.db"
     )
     
     # File Upload Settings
     MAX_UPLOAD_SIZE: int = Field(
-        default=50 * 1024 * 1024,  # 50 MB
-        env="MAX_UPLOAD_SIZE"
+        default=50 * 1024 * 1024  # 50 MB
     )
-    ALLOWED_EXTENSIONS: List[str] = Field(
-        default=["jpg", "jpeg", "png", "tiff", "tif", "raw", "dng", "cr2", "nef"],
-        env="ALLOWED_EXTENSIONS"
+    ALLOWED_EXTENSIONS: FrozenSet[str] = Field(
+        default=frozenset({"jpg", "jpeg", "png", "tiff", "tif", "raw", "dng", "cr2", "nef"})
     )
-    UPLOAD_DIRECTORY: str = Field(default="./uploads", env="UPLOAD_DIRECTORY")
+    UPLOAD_DIRECTORY: str = Field(default="./uploads")
     
     # Celery Settings (for background tasks)
     CELERY_BROKER_URL: str = Field(
-        default="redis://localhost:6379/0",
-        env="CELERY_BROKER_URL"
+        default="redis://localhost:6379/0"
     )
     CELERY_RESULT_BACKEND: str = Field(
-        default="redis://localhost:6379/0",
-        env="CELERY_RESULT_BACKEND"
+        default="redis://localhost:6379/0"
     )
     
+    # Redis for shared state (batch jobs)
+    REDIS_URL: str = Field(default="redis://localhost:6379/0")
+    
     # CORS Settings
-    CORS_ORIGINS: List[str] = Field(
-        default=[
+    CORS_ORIGINS: FrozenSet[str] = Field(
+        default=frozenset({
             "http://localhost:3000",  # Next.js dev server
             "http://localhost:8000",  # FastAPI dev server
             "http://localhost",
-        ],
-        env="CORS_ORIGINS"
+        })
     )
     
     # Logging
-    LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
-    LOG_FILE: Optional[str] = Field(default=None, env="LOG_FILE")
+    LOG_LEVEL: str = Field(default="INFO")
+    LOG_FILE: Optional[str] = Field(default=None)
     
     # ArUco Detection Settings
-    ARUCO_DICT: str = Field(default="DICT_4X4_50", env="ARUCO_DICT")
-    MIN_MARKER_AREA: int = Field(default=100, env="MIN_MARKER_AREA")
+    ARUCO_DICT: str = Field(default="DICT_4X4_50")
+    MIN_MARKER_AREA: int = Field(default=100)
     
     # Color Correction Settings
-    DEFAULT_COLOR_SPACE: str = Field(default="sRGB", env="DEFAULT_COLOR_SPACE")
-    MAX_DELTA_E: float = Field(default=10.0, env="MAX_DELTA_E")
+    DEFAULT_COLOR_SPACE: str = Field(default="sRGB")
+    MAX_DELTA_E: float = Field(default=10.0)
     
     # Pagination
-    DEFAULT_PAGE_SIZE: int = Field(default=20, env="DEFAULT_PAGE_SIZE")
-    MAX_PAGE_SIZE: int = Field(default=100, env="MAX_PAGE_SIZE")
+    DEFAULT_PAGE_SIZE: int = Field(default=20)
+    MAX_PAGE_SIZE: int = Field(default=100)
     
-    @validator("DATABASE_URL", pre=True)
+    @field_validator("DATABASE_URL", mode="before")
+    @classmethod
     def validate_database_url(cls, v: str) -> str:
         """Validate and format database URL.
         
@@ -133,13 +138,14 @@ class Settings(BaseSettings):
         
         return v
     
-    @validator("SECRET_KEY")
-    def validate_secret_key(cls, v: str, values: dict) -> str:
+    @field_validator("SECRET_KEY")
+    @classmethod
+    def validate_secret_key(cls, v: str, info: ValidationInfo) -> str:
         """Validate secret key in production.
         
         Args:
             v: Secret key value
-            values: Other validated values
+            info: Validation info; info.data holds previously validated fields
             
         Returns:
             Validated secret key
@@ -147,7 +153,7 @@ class Settings(BaseSettings):
         Raises:
             ValueError: If using default secret key in production
         """
-        if values.get("ENVIRONMENT") == "production":
+        if info.data.get("ENVIRONMENT") == "production":
             if "change-this" in v.lower() or "super-secret" in v.lower():
                 raise ValueError(
                     "You must set a secure SECRET_KEY in production. "
@@ -155,7 +161,8 @@ class Settings(BaseSettings):
                 )
         return v
     
-    @validator("CORS_ORIGINS", pre=True)
+    @field_validator("CORS_ORIGINS", mode="before")
+    @classmethod
     def parse_cors_origins(cls, v):
         """Parse CORS origins from string or list.
         
@@ -163,13 +170,14 @@ class Settings(BaseSettings):
             v: CORS origins (string or list)
             
         Returns:
-            List of CORS origin strings
+            Frozen set of CORS origin strings (O(1) membership checks)
         """
         if isinstance(v, str):
-            return [origin.strip() for origin in v.split(",")]
+            return frozenset(origin.strip() for origin in v.split(","))
         return v
     
-    @validator("ALLOWED_EXTENSIONS", pre=True)
+    @field_validator("ALLOWED_EXTENSIONS", mode="before")
+    @classmethod
     def parse_allowed_extensions(cls, v):
         """Parse allowed extensions from string or list.
         
@@ -177,11 +185,11 @@ class Settings(BaseSettings):
             v: Allowed extensions (string or list)
             
         Returns:
-            List of allowed extension strings
+            Frozen set of allowed extension strings (O(1) membership checks)
         """
         if isinstance(v, str):
-            return [ext.strip().lower() for ext in v.split(",")]
-        return [ext.lower() for ext in v]
+            return frozenset(ext.strip().lower() for ext in v.split(","))
+        return frozenset(ext.lower() for ext in v)
     
     def is_production(self) -> bool:
         """Check if running in production environment.
@@ -206,12 +214,6 @@ class Settings(BaseSettings):
             True if environment is testing
         """
         return self.ENVIRONMENT.lower() in ["testing", "test"]
-    
-    class Config:
-        """Pydantic configuration."""
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
 
 
 @lru_cache()
@@ -234,3 +236,4 @@ def get_settings() -> Settings:
 
 # Global settings instance
 settings = get_settings()
+
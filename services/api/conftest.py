@@ -11,17 +11,24 @@ Usage:
 """
 
 import os
+from io import BytesIO
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 from typing import Generator
-import tempfile
+
+# Settings are read once at import; select the testing environment first.
+# STRICT_ORM makes database.config's own sessions raise on lazy loads too
+os.environ.setdefault("ENVIRONMENT", "testing")
+os.environ.setdefault("STRICT_ORM", "true")
 
 # Import application components
 try:
     from main import app
     from models.database import Base
+    from database.config import StrictSession, get_db
     from config import settings
 except ImportError:
     # Handle import errors gracefully for documentation
@@ -32,67 +39,126 @@ except ImportError:
 # Database Configuration
 # ============================================================================
 
+@pytest.fixture(scope="session")
+def _app_client() -> Generator[TestClient, None, None]:
+    """Create one FastAPI test client for the whole test session.
+    
+    Entering the client runs the app's startup/shutdown events once per
+    session instead of once per test, and starts the event loop every
+    request runs on (reachable through the client's portal).
+    
+    Yields:
+        Shared FastAPI test client
+    """
+    with TestClient(app) as test_client:
+        yield test_client
+
+
 @pytest.fixture(scope="session")
 def test_database_url() -> str:
     """Get test database URL.
     
-    Uses in-memory SQLite for faster tests.
-    Each test session gets a temporary database file.
+    Uses a named in-memory SQLite database through aiosqlite, so nothing
+    touches the disk and routes get the same AsyncSession API as in
+    production.
     
     Returns:
         SQLite database URL for testing
     """
-    # Create temporary file for test database
-    fd, db_path = tempfile.mkstemp(suffix=".db")
-    os.close(fd)
-    
-    return f"sqlite:///{db_path}"
+    return "sqlite+aiosqlite:///file:memdb_test?mode=memory&cache=shared&uri=true"
 
 
 @pytest.fixture(scope="session")
-def test_engine(test_database_url: str):
+def test_engine(test_database_url: str, _app_client: TestClient):
     """Create test database engine.
     
+    Async connections belong to the event loop they were opened on, so all
+    database work is run on the test client's loop via its portal.
+    
     Args:
         test_database_url: Test database URL
+        _app_client: Session-wide test client
         
     Yields:
-        SQLAlchemy engine for testing
+        SQLAlchemy async engine for testing
     """
-    engine = create_engine(
+    engine = create_async_engine(
         test_database_url,
         connect_args={"check_same_thread": False},
+        # One shared connection: the in-memory database lives only as long
+        # as a connection to it is open
+        poolclass=StaticPool,
         echo=False
     )
     
+    # pysqlite manages transactions itself and breaks SAVEPOINT; hand
+    # BEGIN over to SQLAlchemy so db_session can nest transactions
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
+    async def create_all():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    
+    async def drop_all():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+    
     # Create all tables
-    Base.metadata.create_all(bind=engine)
+    _app_client.portal.call(create_all)
     
     yield engine
     
     # Cleanup
-    Base.metadata.drop_all(bind=engine)
+    _app_client.portal.call(drop_all)
 
 
 @pytest.fixture(scope="function")
-def db_session(test_engine) -> Generator[Session, None, None]:
-    """Create a fresh database session for each test.
+def db_session(test_engine, _app_client: TestClient) -> Generator[AsyncSession, None, None]:
+    """Create an isolated database session for each test.
+    
+    The session is joined to an outer transaction on a dedicated connection
+    and works inside a SAVEPOINT, so commits made by the code under test
+    only release the savepoint. Rolling back the outer transaction at the
+    end discards everything the test wrote, with no per-test DDL.
+    
+    The session lives on the test client's event loop; tests that seed data
+    directly run their coroutine there with client.portal.call(...).
     
     Yields:
-        SQLAlchemy session for testing
-        
-    Yields:
-        Clean database session for each test
+        Clean async database session for each test
     """
-    SessionLocal = sessionmaker(bind=test_engine)
-    session = SessionLocal()
+    portal = _app_client.portal
+    
+    async def begin():
+        connection = await test_engine.connect()
+        transaction = await connection.begin()
+        # StrictSession: lazy relationship loads raise, so tests catch N+1 queries
+        session = AsyncSession(
+            bind=connection,
+            join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
+            autoflush=False,
+            sync_session_class=StrictSession,
+        )
+        return connection, transaction, session
+    
+    async def end():
+        await session.close()
+        await transaction.rollback()
+        await connection.close()
     
+    connection, transaction, session = portal.call(begin)
     try:
         yield session
     finally:
-        # Rollback any uncommitted changes
-        session.rollback()
-        session.close()
+        portal.call(end)
 
 
 # ============================================================================
@@ -100,29 +166,27 @@ def db_session(test_engine) -> Generator[Session, None, None]:
 # ============================================================================
 
 @pytest.fixture
-def client(db_session: Session) -> TestClient:
-    """Create FastAPI test client with test database.
+def client(_app_client: TestClient, db_session: AsyncSession) -> Generator[TestClient, None, None]:
+    """Provide the shared test client bound to this test's database session.
     
     Args:
+        _app_client: Session-wide test client
         db_session: Test database session
         
-    Returns:
+    Yields:
         FastAPI test client
     """
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            db_session.close()
+    async def override_get_db():
+        yield db_session
     
-    # Override database dependency
-    try:
-        from main import get_db
-        app.dependency_overrides[get_db] = override_get_db
-    except ImportError:
-        pass
+    # Routes depend on database.config.get_db; serve this test's session
+    app.dependency_overrides[get_db] = override_get_db
     
-    return TestClient(app)
+    try:
+        yield _app_client
+    finally:
+        app.dependency_overrides.clear()
+        _app_client.cookies.clear()
 
 
 # ============================================================================
@@ -204,27 +268,39 @@ def auth_headers(auth_token: str) -> dict:
 # Sample Data Fixtures
 # ============================================================================
 
+# Minimal valid JPEG, built once per session
+_SAMPLE_JPEG = (
+    b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
+    b'\xff\xdb\x00C\x00\x08\x06\x06\x07\x06\x05\x08\x07\x07\x07\t\t\x08\n\x0c'
+    b'\x14\r\x0c\x0b\x0b\x0c\x19\x12\x13\x0f\x14\x1d\x1a\x1f\x1e\x1d\x1a\x1c'
+    b'\x1c $.\'\"\,#\x1c\x1c(7),01444\x1f\'9=82<.342\xff\xc0\x00\x0b\x08\x00\x01'
+    b'\x00\x01\x01\x11\x00\xff\xc4\x00\x1f\x00\x00\x01\x05\x01\x01\x01\x01'
+    b'\x01\x01\x00\x00\x00\x00\x00\x00\x00\x00\x01\x02\x03\x04\x05\x06\x07'
+    b'\x08\t\n\x0b\xff\xda\x00\x08\x01\x01\x00\x00?\x00\xfb\xd4\xff\xd9'
+)
+
+
+@pytest.fixture(scope="session")
+def jpg_bytes() -> bytes:
+    """Fixture for raw sample JPEG bytes (shared, immutable).
+    
+    Returns:
+        Minimal valid JPEG data
+    """
+    return _SAMPLE_JPEG
+
+
 @pytest.fixture
-def sample_image_file():
+def sample_image_file(jpg_bytes: bytes) -> BytesIO:
     """Fixture for sample image file for upload tests.
     
-    Yields:
-        BytesIO object containing sample image data
+    Args:
+        jpg_bytes: Raw sample JPEG data
+        
+    Returns:
+        Fresh BytesIO positioned at the start of the sample image data
     """
-    from io import BytesIO
-    
-    # Create minimal valid JPEG
-    jpg_data = (
-        b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
-        b'\xff\xdb\x00C\x00\x08\x06\x06\x07\x06\x05\x08\x07\x07\x07\t\t\x08\n\x0c'
-        b'\x14\r\x0c\x0b\x0b\x0c\x19\x12\x13\x0f\x14\x1d\x1a\x1f\x1e\x1d\x1a\x1c'
-        b'\x1c $.\'\"\,#\x1c\x1c(7),01444\x1f\'9=82<.342\xff\xc0\x00\x0b\x08\x00\x01'
-        b'\x00\x01\x01\x11\x00\xff\xc4\x00\x1f\x00\x00\x01\x05\x01\x01\x01\x01'
-        b'\x01\x01\x00\x00\x00\x00\x00\x00\x00\x00\x01\x02\x03\x04\x05\x06\x07'
-        b'\x08\t\n\x0b\xff\xda\x00\x08\x01\x01\x00\x00?\x00\xfb\xd4\xff\xd9'
-    )
-    
-    return BytesIO(jpg_data)
+    return BytesIO(jpg_bytes)
 
 
 @pytest.fixture
@@ -5,7 +5,7 @@ Database models for user management, image processing, job tracking, and results
 
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Boolean, Text, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Boolean, Text, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import enum
@@ -48,13 +48,19 @@ class Image(Base):
     width = Column(Integer, nullable=True)
     height = Column(Integer, nullable=True)
     is_raw = Column(Boolean, default=False)
-    metadata = Column(JSON, nullable=True)  # Camera info, color profile, etc.
+    # "metadata" is reserved on declarative classes; the DB column keeps its name
+    image_metadata = Column("metadata", JSON, nullable=True)  # Camera info, color profile, etc.
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
     owner = relationship("User", back_populates="images")
     jobs = relationship("Job", back_populates="image", cascade="all, delete-orphan")
     
+    # Per-user listing, newest first
+    __table_args__ = (
+        Index("ix_images_user_uploaded", "user_id", uploaded_at.desc()),
+    )
+    
     def __repr__(self):
         return f"<Image(id={self.id}, filename='{self.filename}')>"
 
@@ -93,11 +99,19 @@ class Job(Base):
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     
-    # Relationships
+    # Relationships. Sessions are async, so these cannot lazy-load on
+    # attribute access: queries that serialize them must request them, e.g.
+    # select(Job).options(selectinload(Job.results)) for list endpoints
+    # (joinedload for single rows) to keep it one round-trip, not N+1
     owner = relationship("User", back_populates="jobs")
     image = relationship("Image", back_populates="jobs")
     results = relationship("Result", back_populates="job", cascade="all, delete-orphan", uselist=False)
     
+    # Serves WHERE user_id = ? [AND status = ?] ORDER BY created_at DESC
+    __table_args__ = (
+        Index("ix_jobs_user_status_created", "user_id", "status", created_at.desc()),
+    )
+    
     def __repr__(self):
         return f"<Job(id={self.id}, type='{self.job_type.value}', status='{self.status.value}')>"
 
@@ -107,7 +121,7 @@ class Result(Base):
     __tablename__ = "results"
     
     id = Column(Integer, primary_key=True, index=True)
-    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False, unique=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False, unique=True)  # unique constraint is the index
     
     # Corrected/processed image paths
     corrected_image_path = Column(String(500), nullable=True)
@@ -130,7 +144,7 @@ class Result(Base):
     marker_positions = Column(JSON, nullable=True)  # List of detected marker positions
     
     # Comprehensive metadata
-    metadata = Column(JSON, nullable=True)  # Additional processing information
+    result_metadata = Column("metadata", JSON, nullable=True)  # Additional processing information
     notes = Column(Text, nullable=True)  # User or system notes
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
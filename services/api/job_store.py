@@ -0,0 +1,116 @@
+"""Batch Job State Store.
+
+Batch job state lives in Redis so every API worker and Celery worker sees the
+same jobs, and finished jobs expire instead of accumulating in memory.
+
+Layout:
+    job:<job_id>            hash: status, counters, owner and request fields
+    job:<job_id>:results    list: one JSON-encoded result per processed image
+    jobs:active             sorted set: IDs of jobs in "processing", scored by
+                            the Unix time their hash expires
+
+The API (routers/batch.py) reads and creates jobs with the asyncio client;
+Celery workers record per-image results with record_result().
+"""
+
+import json
+import time
+import weakref
+from typing import Dict, Optional
+
+from utils import utc_timestamp
+
+# Jobs and their results are kept for a day after the last write
+JOB_TTL_SECONDS = 24 * 60 * 60
+
+ACTIVE_JOBS = "jobs:active"
+
+# Statuses after which workers no longer touch a job
+FINAL_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+# Counts one result and applies the resulting status transition in a single
+# atomic step, so concurrent workers cannot interleave a stale status read
+# with the write of another. Results for an expired job are dropped rather
+# than recreating a partial hash.
+#   KEYS: job hash, results list, active set
+#   ARGV: counter field, updated_at, TTL, result JSON, job ID, expiry time
+_RECORD_RESULT_LUA = """
+local status = redis.call('HGET', KEYS[1], 'status')
+if not status then
+    return false
+end
+redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+redis.call('HSET', KEYS[1], 'updated_at', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('RPUSH', KEYS[2], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+if status == 'completed' or status == 'failed' or status == 'cancelled' then
+    return status
+end
+local counts = redis.call('HMGET', KEYS[1], 'total_items', 'processed_items', 'failed_items')
+if tonumber(counts[2]) + tonumber(counts[3]) >= tonumber(counts[1]) then
+    status = 'completed'
+    redis.call('HSET', KEYS[1], 'status', status)
+    redis.call('ZREM', KEYS[3], ARGV[5])
+else
+    status = 'processing'
+    redis.call('HSET', KEYS[1], 'status', status)
+    redis.call('ZADD', KEYS[3], ARGV[6], ARGV[5])
+end
+return status
+"""
+
+
+# Script objects per client, so the script and its SHA are set up once per
+# client rather than once per result
+_record_result_scripts: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _record_result_script(client):
+    """The record_result Lua script registered on client."""
+    script = _record_result_scripts.get(client)
+    if script is None:
+        script = _record_result_scripts[client] = client.register_script(_RECORD_RESULT_LUA)
+    return script
+
+
+def job_key(job_id: str) -> str:
+    """Redis key of the job hash."""
+    return f"job:{job_id}"
+
+
+def results_key(job_id: str) -> str:
+    """Redis key of the job's result list."""
+    return f"job:{job_id}:results"
+
+
+def record_result(client, job_id: str, result: Dict) -> Optional[str]:
+    """Count one processed image and append its result (worker side).
+    
+    The first result moves a queued job to "processing"; the last one moves
+    it to "completed". Both happen in one Lua script, so any number of
+    workers can report for the same job.
+    
+    Args:
+        client: Synchronous redis.Redis client (decode_responses=True)
+        job_id: Batch job ID
+        result: JSON-serializable per-image result; "success" picks the counter
+    
+    Returns:
+        The job's status afterwards, or None if the job no longer exists
+    """
+    counter = "processed_items" if result.get("success") else "failed_items"
+    now = time.time()
+    
+    status = _record_result_script(client)(
+        keys=[job_key(job_id), results_key(job_id), ACTIVE_JOBS],
+        args=[
+            counter,
+            utc_timestamp(),
+            JOB_TTL_SECONDS,
+            json.dumps(result),
+            job_id,
+            int(now) + JOB_TTL_SECONDS,
+        ],
+    )
+    return status or None
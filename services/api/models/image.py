@@ -4,10 +4,10 @@ Defines Image and ImageMetadata models for storing uploaded images and their pro
 """
 
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
-from .database import Base
+from .database import Base, JSONDocument
 
 
 class Image(Base):
@@ -39,10 +39,10 @@ class Image(Base):
     
     # Correction results
     correction_id = Column(String, nullable=True)
-    ccm_matrix = Column(JSON, nullable=True)  # 3x3 matrix as JSON
-    white_balance_gains = Column(JSON, nullable=True)  # [R, G, B] as JSON
+    ccm_matrix = Column(JSONDocument, nullable=True)  # 3x3 matrix as JSON
+    white_balance_gains = Column(JSONDocument, nullable=True)  # [R, G, B] as JSON
     delta_e_overall = Column(Float, nullable=True)
-    delta_e_per_patch = Column(JSON, nullable=True)  # List of ΔE values as JSON
+    delta_e_per_patch = Column(JSONDocument, nullable=True)  # List of ΔE values as JSON
     quality_rating = Column(String, nullable=True)  # Excellent, VeryGood, Good, Fair, Poor
     
     # Output
@@ -52,9 +52,17 @@ class Image(Base):
     upload_date = Column(DateTime, default=datetime.utcnow, nullable=False)
     processed_date = Column(DateTime, nullable=True)
     
-    # Relationships
+    # Relationships. The metadata row is one-to-one and serialized with the
+    # image, so it is joined into the image SELECT rather than fetched per row
     user = relationship("User", back_populates="images")
-    metadata = relationship("ImageMetadata", back_populates="image", uselist=False, cascade="all, delete-orphan")
+    image_metadata = relationship(
+        "ImageMetadata", back_populates="image", uselist=False, cascade="all, delete-orphan", lazy="joined"
+    )
+    
+    # Per-user listing, newest first
+    __table_args__ = (
+        Index("ix_images_user_upload", "user_id", upload_date.desc()),
+    )
     
     def __repr__(self):
         return f"<Image(id={self.id}, filename={self.filename}, status={self.status})>"
@@ -96,7 +104,7 @@ class ImageMetadata(Base):
     gps_longitude = Column(Float, nullable=True)
     
     # Relationships
-    image = relationship("Image", back_populates="metadata")
+    image = relationship("Image", back_populates="image_metadata")
     
     def __repr__(self):
         return f"<ImageMetadata(image_id={self.image_id}, {self.width}x{self.height})>"
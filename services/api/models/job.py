@@ -5,10 +5,10 @@ Defines Job model for batch processing and JobStatus enum.
 
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum, JSON
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum, Index, type_coerce
 from sqlalchemy.orm import relationship
 
-from .database import Base
+from .database import Base, JSONDocument
 
 
 class JobStatus(enum.Enum):
@@ -33,8 +33,8 @@ class Job(Base):
     
     # Job configuration
     operation = Column(String, nullable=False)  # detect, correct, detect_and_correct, remove_background
-    image_ids = Column(JSON, nullable=False)  # List of image IDs to process
-    options = Column(JSON, nullable=True)  # Processing options as JSON
+    image_ids = Column(JSONDocument, nullable=False)  # List of image IDs to process
+    options = Column(JSONDocument, nullable=True)  # Processing options as JSON
     
     # Progress tracking
     total_images = Column(Integer, nullable=False, default=0)
@@ -44,7 +44,7 @@ class Job(Base):
     
     # Results
     results_url = Column(String, nullable=True)
-    error_messages = Column(JSON, nullable=True)  # List of error messages
+    error_messages = Column(JSONDocument, nullable=True)  # List of error messages
     
     # Webhook
     webhook_url = Column(String, nullable=True)
@@ -59,5 +59,27 @@ class Job(Base):
     # Relationships
     user = relationship("User", back_populates="jobs")
     
+    __table_args__ = (
+        # Serves WHERE user_id = ? [AND status = ?] ORDER BY created_at DESC
+        Index("ix_jobs_user_status_created", "user_id", "status", created_at.desc()),
+        # "Jobs containing image X": filter with Job.has_image(image_id) (@>),
+        # served by a compact jsonb_path_ops GIN index on PostgreSQL
+        Index(
+            "ix_jobs_image_ids_gin",
+            "image_ids",
+            postgresql_using="gin",
+            postgresql_ops={"image_ids": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+    
+    @classmethod
+    def has_image(cls, image_id: str):
+        """Filter for jobs whose image_ids contain image_id (PostgreSQL only).
+        
+        image_ids stays JSONB rather than ARRAY(String): the GIN index
+        covers both, and JSONB keeps the column portable to SQLite.
+        """
+        return cls.image_ids.op("@>")(type_coerce([image_id], JSONDocument))
+    
     def __repr__(self):
         return f"<Job(id={self.id}, operation={self.operation}, status={self.status.value})>"
@@ -34,7 +34,10 @@ class User(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     last_login = Column(DateTime, nullable=True)
     
-    # Relationships
+    # Relationships. Collections are unbounded and every authenticated request
+    # loads the user, so they are not eager by default: list queries request
+    # them with select(User).options(selectinload(User.images)), one extra
+    # SELECT for all users instead of one per user
     images = relationship("Image", back_populates="user", cascade="all, delete-orphan")
     jobs = relationship("Job", back_populates="user", cascade="all, delete-orphan")
     
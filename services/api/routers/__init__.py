@@ -10,6 +10,7 @@ This package contains all API route handlers organized by domain:
 """
 
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 
 # Import all routers
 from .auth import router as auth_router
@@ -19,15 +20,17 @@ from .correction import router as correction_router
 from .batch import router as batch_router
 from .reports import router as reports_router
 
-# Create main API router
-api_router = APIRouter()
+# Create main API router; orjson like the app itself (main.py), so routes
+# mounted through here serialize the same way
+api_router = APIRouter(default_response_class=ORJSONResponse)
 
-# Include all sub-routers with prefixes
+# Include all sub-routers with prefixes. detection, correction and batch
+# declare their own prefix, so adding it again would nest it (/batch/batch)
 api_router.include_router(auth_router, prefix="/auth", tags=["authentication"])
 api_router.include_router(images_router, prefix="/images", tags=["images"])
-api_router.include_router(detection_router, prefix="/detect", tags=["detection"])
-api_router.include_router(correction_router, prefix="/correct", tags=["correction"])
-api_router.include_router(batch_router, prefix="/batch", tags=["batch"])
+api_router.include_router(detection_router)
+api_router.include_router(correction_router)
+api_router.include_router(batch_router)
 api_router.include_router(reports_router, prefix="/reports", tags=["reports"])
 
 __all__ = [
@@ -3,14 +3,26 @@
 Handles user authentication, JWT token management, and OAuth flows.
 """
 
-from datetime import datetime, timedelta
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Optional
 
+import jwt
+import redis
+import redis.asyncio as aioredis
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
 from passlib.context import CryptContext
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
+
+from config import settings
+
+logger = logging.getLogger(__name__)
 
 # Configuration
 SECRET_KEY = "your-secret-key-here-change-in-production"
@@ -18,8 +30,25 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# HMAC key bytes, encoded once rather than on every sign/verify
+_KEY = SECRET_KEY.encode()
+
+# Token lifetimes in seconds; "exp" is written as epoch seconds
+_ACCESS_TTL = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_REFRESH_TTL = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
+# Recently verified token payloads, so repeated requests with the same
+# bearer token skip signature verification until the token expires
+_PAYLOAD_CACHE_SIZE = 1024
+_payload_cache: "OrderedDict[str, dict]" = OrderedDict()
+
+# Revoked tokens (access and refresh): "revoked:<jti>" keys that expire
+# with the token
+token_redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# Password hashing: argon2id for new hashes; existing bcrypt hashes still
+# verify and are reported by needs_update() for rehashing on next login
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/signin")
@@ -28,17 +57,33 @@ router = APIRouter()
 
 
 # Schemas
+# Response models are immutable once built; UserResponse can also be
+# filled straight from a User row with model_validate (from_attributes)
 class Token(BaseModel):
     """Token response model."""
+    model_config = ConfigDict(frozen=True)
+    
     access_token: str
     refresh_token: str
     token_type: str = "bearer"
 
 
-class TokenData(BaseModel):
-    """Token payload data."""
+@dataclass(slots=True)
+class TokenData:
+    """Token payload data.
+    
+    A plain dataclass: it is built from an already verified token on every
+    authenticated request and needs no validation.
+    """
     user_id: Optional[str] = None
     email: Optional[str] = None
+    jti: Optional[str] = None  # Token ID, used for revocation
+    exp: Optional[int] = None  # Expiry (Unix time)
+    
+    @property
+    def sub(self) -> Optional[str]:
+        """User ID under its JWT claim name, as used by the routers."""
+        return self.user_id
 
 
 class UserCreate(BaseModel):
@@ -56,6 +101,8 @@ class UserLogin(BaseModel):
 
 class UserResponse(BaseModel):
     """User response model."""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    
     id: str
     email: EmailStr
     full_name: Optional[str] = None
@@ -69,36 +116,110 @@ class RefreshTokenRequest(BaseModel):
 
 
 # Utility functions
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash.
+    
+    Hashing is deliberately slow, so it runs in the threadpool rather than
+    blocking the event loop for every other request.
+    """
+    return await run_in_threadpool(pwd_context.verify, plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password."""
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    """Hash a password (in the threadpool, like verify_password)."""
+    return await run_in_threadpool(pwd_context.hash, password)
 
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create JWT access token."""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+def mint_access_token(sub: str, email: Optional[str]) -> str:
+    """Create JWT access token.
     
-    to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    The payload is a single literal with an epoch-seconds expiry: no
+    claims dict to copy and no datetime to build per token.
+    """
+    return jwt.encode(
+        {
+            "sub": sub,
+            "email": email,
+            "type": "access",
+            "jti": uuid.uuid4().hex,
+            "exp": int(time.time()) + _ACCESS_TTL,
+        },
+        _KEY,
+        algorithm=ALGORITHM,
+    )
+
+
+def mint_refresh_token(sub: str, email: Optional[str]) -> str:
+    """Create JWT refresh token (see mint_access_token)."""
+    return jwt.encode(
+        {
+            "sub": sub,
+            "email": email,
+            "type": "refresh",
+            "jti": uuid.uuid4().hex,
+            "exp": int(time.time()) + _REFRESH_TTL,
+        },
+        _KEY,
+        algorithm=ALGORITHM,
+    )
 
 
-def create_refresh_token(data: dict) -> str:
-    """Create JWT refresh token."""
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+def decode_token(token: str) -> dict:
+    """Verify and decode a JWT, reusing a cached payload while it is unexpired.
+    
+    Raises:
+        jwt.InvalidTokenError: If the signature is invalid, the token expired
+            or it lacks the exp or jti claim (both needed for revocation)
+    """
+    payload = _payload_cache.get(token)
+    if payload is not None:
+        if payload["exp"] > time.time():
+            _payload_cache.move_to_end(token)
+            return payload
+        del _payload_cache[token]
+    
+    payload = jwt.decode(token, _KEY, algorithms=[ALGORITHM], options={"require": ["exp", "jti"]})
+    _payload_cache[token] = payload
+    if len(_payload_cache) > _PAYLOAD_CACHE_SIZE:
+        _payload_cache.popitem(last=False)
+    return payload
+
+
+async def is_revoked(jti: str) -> bool:
+    """Whether a token ID has been revoked (logout or refresh rotation).
+    
+    Fails closed: if the revocation list cannot be read, a revoked token
+    could otherwise pass, so the request is refused with 503 instead.
+    """
+    try:
+        return bool(await token_redis.exists(f"revoked:{jti}"))
+    except redis.RedisError:
+        logger.exception("Token revocation list unavailable")
+        raise _revocation_unavailable()
+
+
+async def revoke(jti: str, exp: int) -> None:
+    """Revoke a token ID until the token would have expired anyway.
+    
+    After that the signature check rejects the token by itself. Like
+    is_revoked, a Redis failure is reported as 503 rather than ignored.
+    """
+    ttl = exp - int(time.time())
+    if ttl <= 0:
+        return
+    try:
+        await token_redis.set(f"revoked:{jti}", "1", ex=ttl)
+    except redis.RedisError:
+        logger.exception("Token revocation list unavailable")
+        raise _revocation_unavailable()
+
+
+def _revocation_unavailable() -> HTTPException:
+    """503 for when the revocation list in Redis cannot be reached."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication temporarily unavailable",
+    )
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
@@ -110,7 +231,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
     )
     
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         user_id: str = payload.get("sub")
         email: str = payload.get("email")
         token_type: str = payload.get("type")
@@ -118,8 +239,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
         if user_id is None or token_type != "access":
             raise credentials_exception
         
-        token_data = TokenData(user_id=user_id, email=email)
-    except JWTError:
+        token_data = TokenData(user_id=user_id, email=email, jti=payload["jti"], exp=payload["exp"])
+    except jwt.InvalidTokenError:
+        raise credentials_exception
+    
+    # Signature checks cannot see logouts; one EXISTS per request can
+    if await is_revoked(token_data.jti):
         raise credentials_exception
     
     return token_data
@@ -175,12 +300,8 @@ async def signin(form_data: OAuth2PasswordRequestForm = Depends()):
     email = form_data.username
     
     # Create tokens
-    access_token = create_access_token(
-        data={"sub": user_id, "email": email}
-    )
-    refresh_token = create_refresh_token(
-        data={"sub": user_id, "email": email}
-    )
+    access_token = mint_access_token(user_id, email)
+    refresh_token = mint_refresh_token(user_id, email)
     
     return Token(
         access_token=access_token,
@@ -210,27 +331,25 @@ async def refresh_token(refresh_data: RefreshTokenRequest):
     )
     
     try:
-        payload = jwt.decode(
-            refresh_data.refresh_token, 
-            SECRET_KEY, 
-            algorithms=[ALGORITHM]
-        )
+        payload = decode_token(refresh_data.refresh_token)
         user_id: str = payload.get("sub")
         email: str = payload.get("email")
         token_type: str = payload.get("type")
         
         if user_id is None or token_type != "refresh":
             raise credentials_exception
-    except JWTError:
+    except jwt.InvalidTokenError:
         raise credentials_exception
     
+    if await is_revoked(payload["jti"]):
+        raise credentials_exception
+    
+    # Rotate: the presented refresh token is single-use
+    await revoke(payload["jti"], payload["exp"])
+    
     # Create new tokens
-    access_token = create_access_token(
-        data={"sub": user_id, "email": email}
-    )
-    new_refresh_token = create_refresh_token(
-        data={"sub": user_id, "email": email}
-    )
+    access_token = mint_access_token(user_id, email)
+    new_refresh_token = mint_refresh_token(user_id, email)
     
     return Token(
         access_token=access_token,
@@ -263,19 +382,36 @@ async def get_current_user_info(current_user: TokenData = Depends(get_current_us
 
 
 @router.post("/logout")
-async def logout(current_user: TokenData = Depends(get_current_user)):
+async def logout(
+    refresh_data: Optional[RefreshTokenRequest] = None,
+    current_user: TokenData = Depends(get_current_user)
+):
     """
-    Logout current user (invalidate token).
+    Logout current user (invalidate tokens).
+    
+    The access token's ID, and the refresh token's if one is sent, are
+    recorded as revoked, so neither can be used (or refreshed) again.
     
     Args:
+        refresh_data: The session's refresh token (optional)
         current_user: Current authenticated user
     
     Returns:
         dict: Success message
-    
-    Note:
-        In production, implement token blacklisting or use Redis for session management
     """
-    # TODO: Implement token blacklisting
+    await revoke(current_user.jti, current_user.exp)
+    
+    if refresh_data is not None:
+        try:
+            payload = decode_token(refresh_data.refresh_token)
+        except jwt.InvalidTokenError:
+            payload = None
+        # Only the caller's own refresh tokens can be revoked here
+        if (
+            payload is not None
+            and payload.get("type") == "refresh"
+            and payload.get("sub") == current_user.user_id
+        ):
+            await revoke(payload["jti"], payload["exp"])
     
     return {"message": "Successfully logged out"}
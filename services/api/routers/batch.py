@@ -4,15 +4,25 @@ Handles batch job creation, monitoring, and management.
 """
 
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, computed_field
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from celery import group
+import redis.asyncio as aioredis
+import json
+import time
 import uuid
-from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+from celery_config import celery_app
+from config import settings
+from utils import utc_timestamp
+import job_store
 from .auth import TokenData, get_current_user
+from .images import find_user_uploads
 
 router = APIRouter(prefix="/batch", tags=["batch"])
 
@@ -24,20 +34,47 @@ class BatchJobRequest(BaseModel):
     callback_url: Optional[str] = None
 
 class BatchJobStatus(BaseModel):
+    # Built once per request from the job hash and never modified
+    model_config = ConfigDict(frozen=True)
+    
     job_id: str
     status: str  # queued, processing, completed, failed
     total_items: int
     processed_items: int
     failed_items: int
-    progress_percent: float
     created_at: str
     updated_at: str
     estimated_completion: Optional[str]
     results_url: Optional[str]
     errors: Optional[List[str]]
+    
+    @computed_field
+    @property
+    def progress_percent(self) -> float:
+        """Share of successfully processed items, derived on serialization."""
+        return (self.processed_items / self.total_items * 100) if self.total_items > 0 else 0.0
+
+# Storage: Redis hashes shared by all API and Celery workers (see job_store)
+job_redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
 
-# Storage
-batch_jobs = {}
+# Worker queue per operation, so workers can subscribe to only the work
+# they are provisioned for (e.g. GPU workers on "correction")
+OPERATION_QUEUES = {
+    "detect": "detection",
+    "correct": "correction",
+    "detect_and_correct": "correction",
+    "remove_background": "processing",
+}
+
+# Results are read from Redis and streamed in pages of this many items
+RESULTS_PAGE_SIZE = 500
+
+def _is_upload_id(value: str) -> bool:
+    """Whether value is an image ID as issued by the upload endpoint (uuid4)."""
+    try:
+        return str(uuid.UUID(value, version=4)) == value
+    except ValueError:
+        return False
 
 @router.post("/jobs", response_model=BatchJobStatus)
 async def create_batch_job(
@@ -67,45 +104,99 @@ async def create_batch_job(
             detail="At least one image ID required"
         )
     
-    if request.operation not in ["detect", "correct", "detect_and_correct", "remove_background"]:
+    if request.operation not in OPERATION_QUEUES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Unknown operation: {request.operation}"
         )
     
-    job_id = str(uuid.uuid4())
-    now = datetime.utcnow().isoformat()
+    invalid = [image_id for image_id in request.image_ids if not _is_upload_id(image_id)]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid image IDs: {', '.join(invalid[:10])}"
+        )
     
-    job = BatchJobStatus(
-        job_id=job_id,
-        status="queued",
-        total_items=len(request.image_ids),
-        processed_items=0,
-        failed_items=0,
-        progress_percent=0.0,
-        created_at=now,
-        updated_at=now,
-        estimated_completion=None,
-        results_url=None,
-        errors=None
-    )
+    # Only the caller's own uploads can be processed; workers get the stored
+    # path resolved here rather than anything built from request input
+    image_paths = await run_in_threadpool(find_user_uploads, current_user.sub, request.image_ids)
+    missing = [image_id for image_id in request.image_ids if image_id not in image_paths]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Images not found: {', '.join(missing[:10])}"
+        )
     
-    batch_jobs[job_id] = {
-        "job": job,
+    job_id = uuid.uuid4().hex
+    now = utc_timestamp()
+    
+    fields = {
+        "status": "queued",
         "user_id": current_user.sub,
         "operation": request.operation,
-        "image_ids": request.image_ids,
-        "options": request.options or {},
-        "callback_url": request.callback_url,
-        "results": []
+        "image_ids": json.dumps(request.image_ids),
+        "options": json.dumps(request.options or {}),
+        "callback_url": request.callback_url or "",
+        "total_items": len(request.image_ids),
+        "processed_items": 0,
+        "failed_items": 0,
+        "created_at": now,
+        "updated_at": now,
     }
+    key = job_store.job_key(job_id)
+    async with job_redis.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, job_store.JOB_TTL_SECONDS)
+        await pipe.execute()
     
-    # In production, submit to Celery queue:
-    # from worker import process_batch
-    # process_batch.delay(job_id, request.image_ids, request.operation, request.options)
+    # One task per image, published together as a group; referenced by name
+    # so the API does not import the worker's CV dependencies
+    queue = OPERATION_QUEUES[request.operation]
+    tasks = group(
+        celery_app.signature(
+            "worker.process_image",
+            args=(job_id, image_id, image_paths[image_id], request.operation, request.options),
+            queue=queue,
+        )
+        for image_id in request.image_ids
+    )
+    await job_redis.hset(key, "group_id", tasks.apply_async().id)
     
     logger.info(f"Batch job created: {job_id} by user {current_user.sub}")
-    return job
+    return _job_status(job_id, fields)
+
+async def _get_owned_job(job_id: str, current_user: TokenData, action: str = "access") -> dict:
+    """Load a job hash, raising 404 if unknown and 403 if not the caller's."""
+    job_data = await job_redis.hgetall(job_store.job_key(job_id))
+    if not job_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    
+    # Check ownership
+    if job_data["user_id"] != current_user.sub:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to {action} this job"
+        )
+    
+    return job_data
+
+def _job_status(job_id: str, job_data: dict) -> BatchJobStatus:
+    """Build the status response from a job hash."""
+    return BatchJobStatus(
+        job_id=job_id,
+        status=job_data["status"],
+        total_items=int(job_data["total_items"]),
+        processed_items=int(job_data["processed_items"]),
+        failed_items=int(job_data["failed_items"]),
+        created_at=job_data["created_at"],
+        updated_at=job_data["updated_at"],
+        estimated_completion=None,
+        results_url=None,
+        errors=None
+    )
 
 @router.get("/jobs/{job_id}", response_model=BatchJobStatus)
 async def get_batch_status(
@@ -122,30 +213,8 @@ async def get_batch_status(
     Returns:
         Current job status
     """
-    if job_id not in batch_jobs:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Job {job_id} not found"
-        )
-    
-    job_data = batch_jobs[job_id]
-    
-    # Check ownership
-    if job_data["user_id"] != current_user.sub:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this job"
-        )
-    
-    # Calculate progress
-    total = job_data["job"].total_items
-    processed = job_data["job"].processed_items
-    progress = (processed / total * 100) if total > 0 else 0
-    
-    job_data["job"].progress_percent = progress
-    job_data["job"].updated_at = datetime.utcnow().isoformat()
-    
-    return job_data["job"]
+    job_data = await _get_owned_job(job_id, current_user)
+    return _job_status(job_id, job_data)
 
 @router.post("/jobs/{job_id}/cancel")
 async def cancel_batch_job(
@@ -155,6 +224,8 @@ async def cancel_batch_job(
     """
     Cancel a batch processing job.
     
+    Queued tasks of a cancelled job are skipped by the workers.
+    
     Args:
         job_id: Job ID
         current_user: Authenticated user
@@ -162,30 +233,22 @@ async def cancel_batch_job(
     Returns:
         Cancellation status
     """
-    if job_id not in batch_jobs:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Job {job_id} not found"
-        )
-    
-    job_data = batch_jobs[job_id]
-    
-    # Check ownership
-    if job_data["user_id"] != current_user.sub:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to cancel this job"
-        )
+    job_data = await _get_owned_job(job_id, current_user, action="cancel")
     
     # Can't cancel if already completed or failed
-    if job_data["job"].status in ["completed", "failed"]:
+    if job_data["status"] in ["completed", "failed"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot cancel job in {job_data['job'].status} state"
+            detail=f"Cannot cancel job in {job_data['status']} state"
         )
     
-    job_data["job"].status = "cancelled"
-    job_data["job"].updated_at = datetime.utcnow().isoformat()
+    async with job_redis.pipeline(transaction=True) as pipe:
+        pipe.hset(job_store.job_key(job_id), mapping={
+            "status": "cancelled",
+            "updated_at": utc_timestamp(),
+        })
+        pipe.zrem(job_store.ACTIVE_JOBS, job_id)
+        await pipe.execute()
     
     logger.info(f"Batch job cancelled: {job_id}")
     return {"message": "Job cancelled", "job_id": job_id}
@@ -198,6 +261,10 @@ async def get_batch_results(
     """
     Get results from a completed batch job.
     
+    The JSON body is streamed: results are copied page by page from Redis,
+    where each is already stored as JSON, so memory use does not grow with
+    the size of the job.
+    
     Args:
         job_id: Job ID
         current_user: Authenticated user
@@ -205,42 +272,50 @@ async def get_batch_results(
     Returns:
         Batch results
     """
-    if job_id not in batch_jobs:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Job {job_id} not found"
-        )
-    
-    job_data = batch_jobs[job_id]
-    
-    # Check ownership
-    if job_data["user_id"] != current_user.sub:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this job"
-        )
+    job_data = await _get_owned_job(job_id, current_user)
     
-    if job_data["job"].status != "completed":
+    if job_data["status"] != "completed":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Job is still {job_data['job'].status}"
+            detail=f"Job is still {job_data['status']}"
         )
     
-    return {
+    summary = json.dumps({
         "job_id": job_id,
-        "total_items": job_data["job"].total_items,
-        "successful": job_data["job"].processed_items,
-        "failed": job_data["job"].failed_items,
-        "results": job_data["results"]
-    }
+        "total_items": int(job_data["total_items"]),
+        "successful": int(job_data["processed_items"]),
+        "failed": int(job_data["failed_items"]),
+    })
+    
+    async def body():
+        # Summary object with the closing brace swapped for the results array
+        yield (summary[:-1] + ', "results": [').encode()
+        key = job_store.results_key(job_id)
+        start = 0
+        while page := await job_redis.lrange(key, start, start + RESULTS_PAGE_SIZE - 1):
+            yield ((", " if start else "") + ", ".join(page)).encode()
+            start += len(page)
+        yield b"]}"
+    
+    return StreamingResponse(body(), media_type="application/json")
 
 @router.get("/health")
 async def batch_health():
     """
     Health check endpoint.
+    
+    active_jobs is the size of the jobs:active set, which workers and
+    cancellation keep up to date on state transitions. Entries whose job
+    hash has expired are dropped first by score, so the cost does not grow
+    with the number of jobs that have run.
     """
+    async with job_redis.pipeline(transaction=True) as pipe:
+        pipe.zremrangebyscore(job_store.ACTIVE_JOBS, "-inf", time.time())
+        pipe.zcard(job_store.ACTIVE_JOBS)
+        _, active_jobs = await pipe.execute()
+    
     return {
         "status": "healthy",
-        "active_jobs": len([j for j in batch_jobs.values() if j["job"].status == "processing"]),
-        "timestamp": datetime.utcnow().isoformat()
+        "active_jobs": active_jobs,
+        "timestamp": utc_timestamp()
     }
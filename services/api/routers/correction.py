@@ -3,29 +3,59 @@
 Handles color correction with CCM calculation and Delta-E metrics.
 """
 
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+from cachetools import LRUCache
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException, status
 import numpy as np
 import logging
-from datetime import datetime
+import time
 import uuid
 
 logger = logging.getLogger(__name__)
 
-# Import CV library
-try:
-    from libs.cv.src.color_cv import ColorCorrectionMatrix, WhiteBalancer, DeltaECalculator
-except ImportError:
-    logger.warning("CV library not available - correction will be disabled")
-    ColorCorrectionMatrix = None
-    WhiteBalancer = None
-    DeltaECalculator = None
-
+from utils import utc_timestamp
 from .auth import TokenData, get_current_user
 
 router = APIRouter(prefix="/correct", tags=["correction"])
 
+# Reference chart patches (sRGB). Their LAB values are constant, so they are
+# converted once (load_cv_library) and each request only converts the
+# measured colors.
+# Both are shared by all requests and therefore read-only
+REFERENCE_RGB = np.array([
+    [115, 82, 68], [194, 150, 130], [98, 122, 157],
+    [87, 108, 67], [133, 128, 177], [103, 189, 170]
+], dtype=np.float32)
+REFERENCE_RGB.flags.writeable = False
+
+
+class CVLibrary(NamedTuple):
+    """Correction classes and the shared Delta-E calculator."""
+    ColorCorrectionMatrix: type
+    WhiteBalancer: type
+    delta_calc: object
+    reference_lab: np.ndarray
+
+
+# The CV library is imported on first use rather than with the router,
+# since it brings in Numba
+@lru_cache(maxsize=1)
+def load_cv_library() -> Optional[CVLibrary]:
+    """CV classes and the reference LAB values, or None if unavailable."""
+    try:
+        from libs.cv.src.color_cv import ColorCorrectionMatrix, WhiteBalancer, DeltaECalculator
+    except ImportError:
+        logger.warning("CV library not available - correction will be disabled")
+        return None
+    
+    delta_calc = DeltaECalculator('ciede2000')
+    reference_lab = delta_calc.to_lab(REFERENCE_RGB)
+    reference_lab.flags.writeable = False
+    return CVLibrary(ColorCorrectionMatrix, WhiteBalancer, delta_calc, reference_lab)
+
+
 # Models
 class CorrectionOptions(BaseModel):
     white_balance_method: str = "gray_world"
@@ -52,8 +82,9 @@ class CorrectionResult(BaseModel):
     timestamp: str
     errors: Optional[List[str]] = None
 
-# Storage
-correction_storage = {}
+# Storage (bounded; least recently used results are evicted)
+RESULT_CACHE_SIZE = 1024
+correction_storage = LRUCache(maxsize=RESULT_CACHE_SIZE)
 
 @router.post("/color", response_model=CorrectionResult)
 async def correct_color(
@@ -81,45 +112,39 @@ async def correct_color(
         CorrectionResult with image and metrics
     """
     
-    if ColorCorrectionMatrix is None:
+    cv = load_cv_library()
+    if cv is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="CV library not available"
         )
     
-    start_time = datetime.utcnow()
+    start_ns = time.perf_counter_ns()
+    timestamp = utc_timestamp()
     correction_id = str(uuid.uuid4())
     
     try:
         # In production, fetch detection from database
         # For now, we would receive detection data in request
-        reference_rgb = np.array([
-            [115, 82, 68], [194, 150, 130], [98, 122, 157],
-            [87, 108, 67], [133, 128, 177], [103, 189, 170]
-        ])
+        reference_rgb = REFERENCE_RGB
         
         # Apply white balance
-        wb = WhiteBalancer(options.white_balance_method)
+        wb = cv.WhiteBalancer(options.white_balance_method)
         # Would apply to actual image in production
         wb_gains = wb.estimate_illuminant(np.zeros((100, 100, 3), dtype=np.uint8))
         
         # Compute CCM
-        ccm = ColorCorrectionMatrix()
+        ccm = cv.ColorCorrectionMatrix()
         matrix = ccm.calculate_from_reference(reference_rgb)
         
         # Calculate Delta-E
-        delta_calc = DeltaECalculator('ciede2000')
-        delta_e_values = []
-        
-        # Simulate patch comparison
+        # Simulate patch comparison; all patches in one call
         measured_rgb = reference_rgb * 1.05  # Simulated measured colors
-        for i in range(len(reference_rgb)):
-            de = delta_calc.calculate(measured_rgb[i], reference_rgb[i])
-            delta_e_values.append(float(de))
+        delta_e = cv.delta_calc.calculate_from_lab(measured_rgb, cv.reference_lab)
         
-        avg_de = float(np.mean(delta_e_values))
-        max_de = float(np.max(delta_e_values))
-        min_de = float(np.min(delta_e_values))
+        avg_de = float(delta_e.mean())
+        max_de = float(delta_e.max())
+        min_de = float(delta_e.min())
         
         # Quality rating
         if avg_de < 2:
@@ -133,16 +158,16 @@ async def correct_color(
         else:
             quality = "Poor"
         
-        metrics = DeltaEMetrics(
+        metrics = DeltaEMetrics.model_construct(
             overall_delta_e=avg_de,
-            per_patch_delta_e=delta_e_values,
+            per_patch_delta_e=delta_e.tolist(),
             max_delta_e=max_de,
             min_delta_e=min_de,
-            patches_above_threshold=len([d for d in delta_e_values if d > 3.0]),
+            patches_above_threshold=int((delta_e > 3.0).sum()),
             quality_rating=quality
         )
         
-        result = CorrectionResult(
+        result = CorrectionResult.model_construct(
             correction_id=correction_id,
             detection_id=detection_id,
             success=True,
@@ -150,8 +175,8 @@ async def correct_color(
             ccm_matrix=matrix.tolist(),
             white_balance_gains=list(wb_gains),
             delta_e_metrics=metrics,
-            processing_time_ms=(datetime.utcnow() - start_time).total_seconds() * 1000,
-            timestamp=start_time.isoformat()
+            processing_time_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
+            timestamp=timestamp
         )
         
         correction_storage[correction_id] = result
@@ -160,7 +185,7 @@ async def correct_color(
         
     except Exception as e:
         logger.error(f"Error in color correction: {str(e)}")
-        return CorrectionResult(
+        return CorrectionResult.model_construct(
             correction_id=correction_id,
             detection_id=detection_id,
             success=False,
@@ -168,8 +193,8 @@ async def correct_color(
             ccm_matrix=None,
             white_balance_gains=None,
             delta_e_metrics=None,
-            processing_time_ms=(datetime.utcnow() - start_time).total_seconds() * 1000,
-            timestamp=start_time.isoformat(),
+            processing_time_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
+            timestamp=timestamp,
             errors=[str(e)]
         )
 
@@ -193,8 +218,9 @@ async def correction_health():
     """
     Health check endpoint.
     """
+    available = load_cv_library() is not None
     return {
-        "status": "healthy" if ColorCorrectionMatrix is not None else "unavailable",
-        "cv_library_available": ColorCorrectionMatrix is not None,
-        "timestamp": datetime.utcnow().isoformat()
+        "status": "healthy" if available else "unavailable",
+        "cv_library_available": available,
+        "timestamp": utc_timestamp()
     }
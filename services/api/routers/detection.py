@@ -3,30 +3,106 @@
 Handles ArUco marker detection using the CV library.
 """
 
+import itertools
+import os
+import threading
+import time
+from functools import lru_cache
 from typing import List, Optional
+from cachetools import LRUCache
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
+from utils import readinto_upload, utc_timestamp
 from .auth import TokenData, get_current_user
 import cv2
 import numpy as np
 import uuid
-from datetime import datetime
 import io
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Import CV library
-try:
-    from libs.cv.src.color_cv import ArucoDetector
-except ImportError:
-    logger.warning("CV library not available - detection will be disabled")
-    ArucoDetector = None
+
+# The CV library is imported on first use rather than with the router,
+# since it brings in Numba
+@lru_cache(maxsize=1)
+def load_aruco_detector():
+    """ArucoDetector class, or None if the CV library is not available."""
+    try:
+        from libs.cv.src.color_cv import ArucoDetector
+    except ImportError:
+        logger.warning("CV library not available - detection will be disabled")
+        return None
+    return ArucoDetector
+
 
 router = APIRouter(prefix="/detect", tags=["detection"])
 
+# Image IDs: process start (ms) + pid, then a per-process counter. Unique
+# across workers and cheaper than formatting a timestamp per request
+_ID_PREFIX = f"{int(time.time() * 1000)}_{os.getpid()}"
+_ID_COUNTER = itertools.count()
+
+# Uploads above this size are decoded at half resolution: JPEG scales in the
+# DCT domain, and the card is resampled to a fixed 600 px canvas anyway.
+# The threshold is on the compressed size, so a poorly compressed file
+# (e.g. a large PNG of a modest resolution) is downscaled as well
+REDUCED_DECODE_BYTES = 8_000_000
+
+
+_local = threading.local()
+
+
+def get_detector():
+    """ArucoDetector for the calling thread, built once per thread.
+    
+    Detection runs in the threadpool and the detector keeps a mutable warp
+    cache, so threads do not share one instance.
+    """
+    detector = getattr(_local, "detector", None)
+    if detector is None:
+        detector = _local.detector = load_aruco_detector()(corner_refinement=True)
+    return detector
+
+
+def detect_card(image: np.ndarray):
+    """Run card detection with the calling thread's detector."""
+    return get_detector().detect(image, extract_patches=True)
+
+
+def read_upload_array(file: UploadFile) -> np.ndarray:
+    """Read an upload straight into a uint8 array sized to it.
+    
+    One copy out of the spooled upload, with no intermediate bytes object.
+    """
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    
+    buf = np.empty(size, dtype=np.uint8)
+    view = memoryview(buf)
+    pos = 0
+    while pos < size:
+        n = readinto_upload(file, view[pos:])
+        if not n:
+            break
+        pos += n
+    return buf[:pos]
+
+
+def decode_image(nparr: np.ndarray) -> Optional[np.ndarray]:
+    """Decode an uploaded image for detection (None if undecodable)."""
+    if nparr.size > REDUCED_DECODE_BYTES:
+        return cv2.imdecode(nparr, cv2.IMREAD_REDUCED_COLOR_2)
+    return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+
 # Pydantic Models
+# FastAPI validates handler return values against response_model, so
+# building responses with model_construct leaves one validation pass
+# instead of two
 class PatchData(BaseModel):
     patch_id: int
     center: tuple
@@ -48,8 +124,10 @@ class DetectionResult(BaseModel):
     timestamp: str
     errors: Optional[List[str]] = None
 
-# Global storage (in production, use database)
-detection_storage = {}
+# Global storage (in production, use database). Bounded: the oldest
+# results are evicted rather than growing without limit
+RESULT_CACHE_SIZE = 1024
+detection_storage = LRUCache(maxsize=RESULT_CACHE_SIZE)
 
 @router.post("/card", response_model=DetectionResult)
 async def detect_color_card(
@@ -70,24 +148,28 @@ async def detect_color_card(
         DetectionResult with patches and metadata
     """
     
-    if ArucoDetector is None:
+    if load_aruco_detector() is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="CV library not available"
         )
     
-    start_time = datetime.utcnow()
+    # Elapsed time from the monotonic clock; wall-clock time only for the timestamp
+    start_ns = time.perf_counter_ns()
+    timestamp = utc_timestamp()
     detection_id = str(uuid.uuid4())
-    image_id = f"{current_user.sub}_{start_time.timestamp()}"
+    image_id = f"{current_user.sub}_{_ID_PREFIX}_{next(_ID_COUNTER)}"
     
     try:
-        # Read image file
-        contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # Read image file; the spool may be on disk
+        nparr = await run_in_threadpool(read_upload_array, file)
+        
+        # Decoding and detection are CPU-bound (OpenCV releases the GIL), so
+        # they run in the threadpool instead of blocking the event loop
+        image = await run_in_threadpool(decode_image, nparr)
         
         if image is None:
-            return DetectionResult(
+            return DetectionResult.model_construct(
                 detection_id=detection_id,
                 image_id=image_id,
                 success=False,
@@ -96,17 +178,16 @@ async def detect_color_card(
                 patches=[],
                 patches_count=0,
                 confidence=0.0,
-                processing_time_ms=(datetime.utcnow() - start_time).total_seconds() * 1000,
-                timestamp=start_time.isoformat(),
+                processing_time_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
+                timestamp=timestamp,
                 errors=["Failed to decode image"]
             )
         
         # Detect color card
-        detector = ArucoDetector(corner_refinement=True)
-        result = detector.detect(image, extract_patches=True)
+        result = await run_in_threadpool(detect_card, image)
         
         if result is None:
-            return DetectionResult(
+            return DetectionResult.model_construct(
                 detection_id=detection_id,
                 image_id=image_id,
                 success=False,
@@ -115,15 +196,15 @@ async def detect_color_card(
                 patches=[],
                 patches_count=0,
                 confidence=0.0,
-                processing_time_ms=(datetime.utcnow() - start_time).total_seconds() * 1000,
-                timestamp=start_time.isoformat(),
+                processing_time_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
+                timestamp=timestamp,
                 errors=["No color card detected in image"]
             )
         
         # Convert patches to response format
         patches_data = []
         for patch in result.patches:
-            patch_data = PatchData(
+            patch_data = PatchData.model_construct(
                 patch_id=patch.patch_id,
                 center=patch.center,
                 bbox=patch.bbox,
@@ -133,7 +214,7 @@ async def detect_color_card(
             )
             patches_data.append(patch_data)
         
-        detection_result = DetectionResult(
+        detection_result = DetectionResult.model_construct(
             detection_id=detection_id,
             image_id=image_id,
             success=True,
@@ -142,8 +223,8 @@ async def detect_color_card(
             patches=patches_data,
             patches_count=len(patches_data),
             confidence=float(result.confidence),
-            processing_time_ms=(datetime.utcnow() - start_time).total_seconds() * 1000,
-            timestamp=start_time.isoformat()
+            processing_time_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
+            timestamp=timestamp
         )
         
         # Store detection result
@@ -154,8 +235,8 @@ async def detect_color_card(
         
     except Exception as e:
         logger.error(f"Error in color card detection: {str(e)}")
-        processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
-        return DetectionResult(
+        processing_time = (time.perf_counter_ns() - start_ns) / 1_000_000
+        return DetectionResult.model_construct(
             detection_id=detection_id,
             image_id=image_id,
             success=False,
@@ -165,7 +246,7 @@ async def detect_color_card(
             patches_count=0,
             confidence=0.0,
             processing_time_ms=processing_time,
-            timestamp=start_time.isoformat(),
+            timestamp=timestamp,
             errors=[str(e)]
         )
 
@@ -197,8 +278,9 @@ async def detection_health():
     """
     Health check endpoint for detection service.
     """
+    available = load_aruco_detector() is not None
     return {
-        "status": "healthy" if ArucoDetector is not None else "unavailable",
-        "cv_library_available": ArucoDetector is not None,
-        "timestamp": datetime.utcnow().isoformat()
+        "status": "healthy" if available else "unavailable",
+        "cv_library_available": available,
+        "timestamp": utc_timestamp()
     }
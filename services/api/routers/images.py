@@ -6,11 +6,12 @@ Handles image uploads, storage, metadata management, and retrieval.
 import os
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from pydantic import BaseModel
 
+from utils import copy_upload_to_file
 from .auth import TokenData, get_current_user
 
 router = APIRouter()
@@ -18,7 +19,7 @@ router = APIRouter()
 # Configuration
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100 MB
-ALLOWED_EXTENSIONS = [".jpg", ".jpeg", ".png", ".tiff", ".tif", ".dng", ".raw"]
+ALLOWED_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".tiff", ".tif", ".dng", ".raw"})
 
 
 # Schemas
@@ -70,12 +71,39 @@ def validate_file(file: UploadFile) -> bool:
     if file_ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type {file_ext} not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+            detail=f"File type {file_ext} not allowed. Allowed types: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
         )
     
     return True
 
 
+def upload_mime_type(file: UploadFile) -> str:
+    """Bare, lower-case MIME type of an upload (parameters such as charset dropped)."""
+    content_type = (file.content_type or "").split(";", 1)[0].strip().lower()
+    return content_type or "application/octet-stream"
+
+
+def find_user_uploads(user_id: str, image_ids: Iterable[str]) -> Dict[str, str]:
+    """Stored paths of the user's uploads among image_ids.
+    
+    Uploads are saved in the user's own directory as <file_id><ext>, so a
+    file found there belongs to the user. IDs without an upload are omitted.
+    """
+    wanted = set(image_ids)
+    user_dir = os.path.join(UPLOAD_DIR, user_id)
+    try:
+        names = os.listdir(user_dir)
+    except FileNotFoundError:
+        return {}
+    
+    found = {}
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        if stem in wanted and ext.lower() in ALLOWED_EXTENSIONS:
+            found[stem] = os.path.join(user_dir, name)
+    return found
+
+
 async def save_upload_file(file: UploadFile, user_id: str) -> tuple:
     """Save uploaded file to storage."""
     # Generate unique filename
@@ -90,18 +118,20 @@ async def save_upload_file(file: UploadFile, user_id: str) -> tuple:
     # Save file
     file_path = os.path.join(user_dir, stored_filename)
     
-    # Read and save file
-    content = await file.read()
-    file_size = len(content)
-    
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE / (1024*1024)} MB"
-        )
-    
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Stream to disk in chunks: memory use is bounded by the chunk size, not
+    # the upload size, and the writes do not block the event loop
+    try:
+        file_size = await copy_upload_to_file(file, file_path, MAX_FILE_SIZE)
+        if file_size > MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE / (1024*1024)} MB"
+            )
+    except BaseException:
+        # Do not leave partial uploads behind
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
     
     return file_id, file_path, file_size
 
@@ -137,12 +167,12 @@ async def upload_image(
         # TODO: Save to database
         
         # Mock response for now
-        return ImageResponse(
+        return ImageResponse.model_construct(
             id=file_id,
             filename=file_id + os.path.splitext(file.filename)[1],
             original_filename=file.filename,
             file_size=file_size,
-            mime_type=file.content_type or "application/octet-stream",
+            mime_type=upload_mime_type(file),
             upload_date=datetime.utcnow(),
             user_id=current_user.user_id,
             storage_path=file_path,
@@ -188,12 +218,12 @@ async def upload_images_batch(
             validate_file(file)
             file_id, file_path, file_size = await save_upload_file(file, current_user.user_id)
             
-            uploaded_images.append(ImageResponse(
+            uploaded_images.append(ImageResponse.model_construct(
                 id=file_id,
                 filename=file_id + os.path.splitext(file.filename)[1],
                 original_filename=file.filename,
                 file_size=file_size,
-                mime_type=file.content_type or "application/octet-stream",
+                mime_type=upload_mime_type(file),
                 upload_date=datetime.utcnow(),
                 user_id=current_user.user_id,
                 storage_path=file_path,
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
 import uuid
@@ -15,7 +16,7 @@ router = APIRouter(prefix="/jobs", tags=["jobs"])
 async def create_job(
     job_data: JobCreateSchema,
     user_id: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> JobSchema:
     """
     Create a new processing job
@@ -45,8 +46,8 @@ async def create_job(
     )
     
     db.add(new_job)
-    db.commit()
-    db.refresh(new_job)
+    await db.commit()
+    await db.refresh(new_job)
     
     return new_job
 
@@ -57,7 +58,7 @@ async def list_jobs(
     status: str = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> List[JobSchema]:
     """
     List user's processing jobs with optional filtering
@@ -72,12 +73,15 @@ async def list_jobs(
             detail="Not authenticated"
         )
     
-    query = db.query(Job).filter(Job.user_id == uuid.UUID(user_id))
+    query = select(Job).where(Job.user_id == uuid.UUID(user_id))
     
     if status:
-        query = query.filter(Job.status == status)
+        query = query.where(Job.status == status)
     
-    jobs = query.offset(skip).limit(limit).all()
+    # Newest first; matches the (user_id, status, created_at DESC) index
+    query = query.order_by(Job.created_at.desc())
+    
+    jobs = (await db.scalars(query.offset(skip).limit(limit))).all()
     return jobs
 
 
@@ -85,7 +89,7 @@ async def list_jobs(
 async def get_job(
     job_id: str,
     user_id: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> JobSchema:
     """
     Get specific job details by ID
@@ -98,10 +102,12 @@ async def get_job(
             detail="Not authenticated"
         )
     
-    job = db.query(Job).filter(
-        Job.id == uuid.UUID(job_id),
-        Job.user_id == uuid.UUID(user_id)
-    ).first()
+    job = await db.scalar(
+        select(Job).where(
+            Job.id == uuid.UUID(job_id),
+            Job.user_id == uuid.UUID(user_id)
+        )
+    )
     
     if not job:
         raise HTTPException(
@@ -117,7 +123,7 @@ async def update_job(
     job_id: str,
     job_data: JobUpdateSchema,
     user_id: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> JobSchema:
     """
     Update job status, progress, or metadata
@@ -134,10 +140,12 @@ async def update_job(
             detail="Not authenticated"
         )
     
-    job = db.query(Job).filter(
-        Job.id == uuid.UUID(job_id),
-        Job.user_id == uuid.UUID(user_id)
-    ).first()
+    job = await db.scalar(
+        select(Job).where(
+            Job.id == uuid.UUID(job_id),
+            Job.user_id == uuid.UUID(user_id)
+        )
+    )
     
     if not job:
         raise HTTPException(
@@ -161,8 +169,8 @@ async def update_job(
     
     job.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
     
     return job
 
@@ -171,7 +179,7 @@ async def update_job(
 async def delete_job(
     job_id: str,
     user_id: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> None:
     """
     Delete or cancel a job
@@ -184,10 +192,12 @@ async def delete_job(
             detail="Not authenticated"
         )
     
-    job = db.query(Job).filter(
-        Job.id == uuid.UUID(job_id),
-        Job.user_id == uuid.UUID(user_id)
-    ).first()
+    job = await db.scalar(
+        select(Job).where(
+            Job.id == uuid.UUID(job_id),
+            Job.user_id == uuid.UUID(user_id)
+        )
+    )
     
     if not job:
         raise HTTPException(
@@ -198,4 +208,4 @@ async def delete_job(
     job.status = JobStatusEnum.CANCELLED
     job.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
 import uuid
@@ -15,7 +16,7 @@ router = APIRouter(prefix="/results", tags=["results"])
 async def create_result(
     result_data: ResultCreateSchema,
     user_id: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> ResultSchema:
     """
     Store processing result
@@ -34,14 +35,14 @@ async def create_result(
     new_result = Result(
         job_id=result_data.job_id,
         result_image_path=result_data.result_image_path,
-        metadata=result_data.metadata,
+        result_metadata=result_data.metadata,
         color_correction_data=result_data.color_correction_data,
         created_at=datetime.utcnow()
     )
     
     db.add(new_result)
-    db.commit()
-    db.refresh(new_result)
+    await db.commit()
+    await db.refresh(new_result)
     
     return new_result
 
@@ -52,7 +53,7 @@ async def list_results(
     job_id: str = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> List[ResultSchema]:
     """
     List processing results with optional job filtering
@@ -67,12 +68,12 @@ async def list_results(
             detail="Not authenticated"
         )
     
-    query = db.query(Result)
+    query = select(Result)
     
     if job_id:
-        query = query.filter(Result.job_id == uuid.UUID(job_id))
+        query = query.where(Result.job_id == uuid.UUID(job_id))
     
-    results = query.offset(skip).limit(limit).all()
+    results = (await db.scalars(query.offset(skip).limit(limit))).all()
     return results
 
 
@@ -80,7 +81,7 @@ async def list_results(
 async def get_result(
     result_id: str,
     user_id: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> ResultSchema:
     """
     Get specific result by ID
@@ -93,9 +94,11 @@ async def get_result(
             detail="Not authenticated"
         )
     
-    result = db.query(Result).filter(
-        Result.id == uuid.UUID(result_id)
-    ).first()
+    result = await db.scalar(
+        select(Result).where(
+            Result.id == uuid.UUID(result_id)
+        )
+    )
     
     if not result:
         raise HTTPException(
@@ -111,7 +114,7 @@ async def update_result(
     result_id: str,
     result_data: ResultUpdateSchema,
     user_id: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> ResultSchema:
     """
     Update result quality score or metadata
@@ -126,9 +129,11 @@ async def update_result(
             detail="Not authenticated"
         )
     
-    result = db.query(Result).filter(
-        Result.id == uuid.UUID(result_id)
-    ).first()
+    result = await db.scalar(
+        select(Result).where(
+            Result.id == uuid.UUID(result_id)
+        )
+    )
     
     if not result:
         raise HTTPException(
@@ -140,15 +145,13 @@ async def update_result(
         result.quality_score = max(0.0, min(1.0, result_data.quality_score))
     
     if result_data.metadata is not None:
-        if result.metadata:
-            result.metadata.update(result_data.metadata)
-        else:
-            result.metadata = result_data.metadata
+        # Assign a new dict: in-place changes to a JSON column are not tracked
+        result.result_metadata = {**(result.result_metadata or {}), **result_data.metadata}
     
     result.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(result)
+    await db.commit()
+    await db.refresh(result)
     
     return result
 
@@ -157,7 +160,7 @@ async def update_result(
 async def delete_result(
     result_id: str,
     user_id: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> None:
     """
     Delete a result record
@@ -170,9 +173,11 @@ async def delete_result(
             detail="Not authenticated"
         )
     
-    result = db.query(Result).filter(
-        Result.id == uuid.UUID(result_id)
-    ).first()
+    result = await db.scalar(
+        select(Result).where(
+            Result.id == uuid.UUID(result_id)
+        )
+    )
     
     if not result:
         raise HTTPException(
@@ -180,5 +185,5 @@ async def delete_result(
             detail="Result not found"
         )
     
-    db.delete(result)
-    db.commit()
+    await db.delete(result)
+    await db.commit()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import AliasChoices, BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 import uuid
@@ -243,7 +243,8 @@ class ResultSchema(BaseModel):
     id: uuid.UUID
     job_id: uuid.UUID
     result_image_path: str
-    metadata: dict
+    # ORM attribute is result_metadata ("metadata" is reserved by SQLAlchemy)
+    metadata: dict = Field(validation_alias=AliasChoices("result_metadata", "metadata"))
     color_correction_data: Optional[dict] = None
     processing_time: Optional[float] = None
     quality_score: Optional[float] = None
@@ -1 +1,160 @@
+"""Tests for token refresh, logout and revocation."""
+import time
 
+import jwt
+import pytest
+import redis
+
+from routers import auth
+
+AUTH = "/api/v1/auth"
+
+
+@pytest.fixture
+def token_redis(monkeypatch):
+    """Replace the revocation list with an in-memory Redis.
+    
+    Returns a synchronous client on the same server, for inspection.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(auth, "token_redis", fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+    return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+
+@pytest.fixture
+def tokens(client, token_redis) -> dict:
+    """Access and refresh tokens from a sign-in."""
+    response = client.post(
+        f"{AUTH}/signin",
+        data={"username": "user@example.com", "password": "password"},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def _bearer(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def _sign(payload: dict) -> str:
+    """A token with the given claims, signed with the API's key."""
+    return jwt.encode(payload, auth._KEY, algorithm=auth.ALGORITHM)
+
+
+class TestRequiredClaims:
+    """Test that validly signed tokens with missing claims are rejected."""
+
+    def test_access_token_without_expiry(self, client, token_redis):
+        """Test that a token without exp is rejected, also on repeat use."""
+        token = _sign({"sub": "user_123", "type": "access", "jti": "no-exp"})
+        headers = {"Authorization": f"Bearer {token}"}
+
+        assert client.get(f"{AUTH}/me", headers=headers).status_code == 401
+        assert client.get(f"{AUTH}/me", headers=headers).status_code == 401
+
+    def test_access_token_without_id(self, client, token_redis):
+        """Test that an access token without jti, which cannot be revoked, is rejected."""
+        token = _sign({"sub": "user_123", "type": "access", "exp": int(time.time()) + 60})
+
+        response = client.get(f"{AUTH}/me", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 401
+
+    def test_refresh_token_without_id(self, client, token_redis):
+        """Test that a refresh token without jti cannot be used."""
+        token = _sign({"sub": "user_123", "type": "refresh", "exp": int(time.time()) + 60})
+
+        response = client.post(f"{AUTH}/refresh", json={"refresh_token": token})
+
+        assert response.status_code == 401
+
+    def test_logout_ignores_refresh_token_without_id(self, client, tokens):
+        """Test that logout with such a refresh token still succeeds."""
+        token = _sign({"sub": "user_123", "type": "refresh", "exp": int(time.time()) + 60})
+
+        response = client.post(f"{AUTH}/logout", headers=_bearer(tokens), json={"refresh_token": token})
+
+        assert response.status_code == 200
+
+
+class TestRefresh:
+    """Test refresh token rotation."""
+
+    def test_refresh_token_has_id(self, tokens):
+        """Test that refresh tokens carry a jti so they can be revoked."""
+        payload = jwt.decode(tokens["refresh_token"], options={"verify_signature": False})
+        assert payload["type"] == "refresh"
+        assert payload["jti"]
+
+    def test_refresh_issues_new_tokens(self, client, tokens):
+        """Test that a valid refresh token yields a new token pair."""
+        response = client.post(f"{AUTH}/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+        assert response.status_code == 200
+        assert response.json()["refresh_token"] != tokens["refresh_token"]
+
+    def test_refresh_token_is_single_use(self, client, tokens):
+        """Test that a refresh token cannot be used twice."""
+        body = {"refresh_token": tokens["refresh_token"]}
+        assert client.post(f"{AUTH}/refresh", json=body).status_code == 200
+        assert client.post(f"{AUTH}/refresh", json=body).status_code == 401
+
+    def test_access_token_cannot_refresh(self, client, tokens):
+        """Test that an access token is rejected by the refresh endpoint."""
+        response = client.post(f"{AUTH}/refresh", json={"refresh_token": tokens["access_token"]})
+        assert response.status_code == 401
+
+
+class TestLogout:
+    """Test that logout revokes the session's tokens."""
+
+    def test_logout_revokes_access_token(self, client, tokens):
+        """Test that the access token is rejected after logout."""
+        assert client.get(f"{AUTH}/me", headers=_bearer(tokens)).status_code == 200
+
+        assert client.post(f"{AUTH}/logout", headers=_bearer(tokens)).status_code == 200
+
+        assert client.get(f"{AUTH}/me", headers=_bearer(tokens)).status_code == 401
+
+    def test_logout_revokes_refresh_token(self, client, tokens):
+        """Test that a logged-out session cannot obtain new tokens."""
+        response = client.post(
+            f"{AUTH}/logout",
+            headers=_bearer(tokens),
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        assert response.status_code == 200
+
+        response = client.post(f"{AUTH}/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 401
+
+    def test_revocation_expires_with_token(self, client, tokens, token_redis):
+        """Test that revocation entries are kept no longer than the token lives."""
+        client.post(f"{AUTH}/logout", headers=_bearer(tokens))
+
+        payload = jwt.decode(tokens["access_token"], options={"verify_signature": False})
+        ttl = token_redis.ttl(f"revoked:{payload['jti']}")
+        assert 0 < ttl <= auth.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+class _UnavailableRedis:
+    """Revocation store whose every call fails like a lost connection."""
+
+    async def exists(self, *args, **kwargs):
+        raise redis.ConnectionError("connection refused")
+
+    async def set(self, *args, **kwargs):
+        raise redis.ConnectionError("connection refused")
+
+
+class TestRevocationOutage:
+    """Test behaviour when Redis is unreachable."""
+
+    def test_authenticated_request_fails_closed(self, client, tokens, monkeypatch):
+        """Test that requests are refused with 503, not accepted or 500."""
+        monkeypatch.setattr(auth, "token_redis", _UnavailableRedis())
+
+        response = client.get(f"{AUTH}/me", headers=_bearer(tokens))
+
+        assert response.status_code == 503
@@ -0,0 +1,148 @@
+"""Tests for batch job creation and job state."""
+import time
+import uuid
+
+import pytest
+
+import job_store
+from routers import images
+from routers.batch import _is_upload_id
+from utils import utc_timestamp
+
+
+class TestImageOwnership:
+    """Test that batch jobs only reference the caller's own uploads."""
+
+    def test_upload_id_accepts_uuid4(self):
+        """Test that IDs issued by the upload endpoint are accepted."""
+        assert _is_upload_id(str(uuid.uuid4())) is True
+
+    @pytest.mark.parametrize("image_id", [
+        "../other_user/" + str(uuid.uuid4()),
+        "*",
+        str(uuid.uuid4()).upper(),
+        uuid.uuid4().hex,
+        str(uuid.uuid1()),
+        "",
+    ])
+    def test_upload_id_rejects_other_values(self, image_id):
+        """Test that paths, globs and non-uuid4 values are rejected."""
+        assert _is_upload_id(image_id) is False
+
+    def test_find_user_uploads_only_searches_own_directory(self, tmp_path, monkeypatch):
+        """Test that another user's upload is not found."""
+        monkeypatch.setattr(images, "UPLOAD_DIR", str(tmp_path))
+        own_id, other_id = str(uuid.uuid4()), str(uuid.uuid4())
+        (tmp_path / "alice").mkdir()
+        (tmp_path / "bob").mkdir()
+        (tmp_path / "alice" / f"{own_id}.jpg").write_bytes(b"x")
+        (tmp_path / "bob" / f"{other_id}.jpg").write_bytes(b"x")
+
+        found = images.find_user_uploads("alice", [own_id, other_id])
+
+        assert found == {own_id: str(tmp_path / "alice" / f"{own_id}.jpg")}
+
+    def test_find_user_uploads_without_directory(self, tmp_path, monkeypatch):
+        """Test that a user with no uploads has nothing found."""
+        monkeypatch.setattr(images, "UPLOAD_DIR", str(tmp_path))
+        assert images.find_user_uploads("nobody", [str(uuid.uuid4())]) == {}
+
+
+@pytest.fixture
+def redis_client():
+    """In-memory Redis with Lua scripting, for job_store tests."""
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def _create_job(client, job_id="job1", total=2, status="queued"):
+    """Write a job hash the way create_batch_job does."""
+    client.hset(job_store.job_key(job_id), mapping={
+        "status": status,
+        "total_items": total,
+        "processed_items": 0,
+        "failed_items": 0,
+    })
+    return job_id
+
+
+class TestRecordResult:
+    """Test job state transitions driven by worker results."""
+
+    def test_first_result_moves_queued_to_processing(self, redis_client):
+        """Test that a partial job becomes processing and is tracked as active."""
+        job_id = _create_job(redis_client, total=2)
+
+        status = job_store.record_result(redis_client, job_id, {"success": True})
+
+        assert status == "processing"
+        assert redis_client.hget(job_store.job_key(job_id), "status") == "processing"
+        assert redis_client.zscore(job_store.ACTIVE_JOBS, job_id) > time.time()
+
+    def test_last_result_completes_job(self, redis_client):
+        """Test that the last result completes the job and untracks it."""
+        job_id = _create_job(redis_client, total=2)
+
+        job_store.record_result(redis_client, job_id, {"success": True})
+        status = job_store.record_result(redis_client, job_id, {"success": False})
+
+        job = redis_client.hgetall(job_store.job_key(job_id))
+        assert status == "completed"
+        assert job["status"] == "completed"
+        assert job["processed_items"] == "1"
+        assert job["failed_items"] == "1"
+        assert redis_client.llen(job_store.results_key(job_id)) == 2
+        assert redis_client.zscore(job_store.ACTIVE_JOBS, job_id) is None
+
+    def test_single_item_job_completes_from_queued(self, redis_client):
+        """Test that a one-image job goes straight from queued to completed."""
+        job_id = _create_job(redis_client, total=1)
+
+        assert job_store.record_result(redis_client, job_id, {"success": True}) == "completed"
+        assert redis_client.zcard(job_store.ACTIVE_JOBS) == 0
+
+    def test_completed_job_is_not_reopened(self, redis_client):
+        """Test that a late result cannot move a completed job back to processing."""
+        job_id = _create_job(redis_client, total=1)
+        job_store.record_result(redis_client, job_id, {"success": True})
+
+        status = job_store.record_result(redis_client, job_id, {"success": True})
+
+        assert status == "completed"
+        assert redis_client.zcard(job_store.ACTIVE_JOBS) == 0
+
+    def test_cancelled_job_keeps_its_status(self, redis_client):
+        """Test that results for a cancelled job do not change its status."""
+        job_id = _create_job(redis_client, total=2, status="cancelled")
+
+        status = job_store.record_result(redis_client, job_id, {"success": True})
+
+        assert status == "cancelled"
+        assert redis_client.hget(job_store.job_key(job_id), "status") == "cancelled"
+        assert redis_client.zcard(job_store.ACTIVE_JOBS) == 0
+
+    def test_updated_at_matches_api_format(self, redis_client):
+        """Test that updated_at is written like the API's own timestamps."""
+        job_id = _create_job(redis_client, total=2)
+
+        job_store.record_result(redis_client, job_id, {"success": True})
+
+        updated_at = redis_client.hget(job_store.job_key(job_id), "updated_at")
+        assert len(updated_at) == len(utc_timestamp())
+        assert "+" not in updated_at and "." not in updated_at
+
+    def test_script_is_registered_once_per_client(self, redis_client):
+        """Test that repeated results reuse the registered script."""
+        job_id = _create_job(redis_client, total=3)
+        job_store.record_result(redis_client, job_id, {"success": True})
+        script = job_store._record_result_scripts[redis_client]
+
+        job_store.record_result(redis_client, job_id, {"success": True})
+
+        assert job_store._record_result_scripts[redis_client] is script
+
+    def test_expired_job_is_not_recreated(self, redis_client):
+        """Test that a result for an expired job writes nothing."""
+        assert job_store.record_result(redis_client, "gone", {"success": True}) is None
+        assert not redis_client.exists(job_store.job_key("gone"))
+        assert not redis_client.exists(job_store.results_key("gone"))
@@ -1,6 +1,13 @@
 """Tests for utility functions."""
+import os
 import pytest
 from datetime import datetime
+from tempfile import SpooledTemporaryFile
+
+from fastapi import HTTPException, UploadFile
+
+import utils
+from routers import images
 from utils import (
     generate_token,
     hash_password,
@@ -8,6 +15,9 @@ from utils import (
     validate_email,
     sanitize_filename,
     create_logger,
+    copy_upload_to_file,
+    _sendfile_upload,
+    UPLOAD_CHUNK_SIZE,
 )
 
 
@@ -118,3 +128,85 @@ class TestLogger:
         """Test that logger has handlers configured."""
         logger = create_logger("test_logger_2")
         assert len(logger.handlers) > 0
+
+
+# Spans several chunks, with a partial last chunk
+UPLOAD_DATA = os.urandom(2 * UPLOAD_CHUNK_SIZE + 123)
+
+
+def _upload(data, spilled):
+    """UploadFile over a spool that is in memory or has spilled to disk."""
+    spool = SpooledTemporaryFile(max_size=len(data) + 1)
+    spool.write(data)
+    if spilled:
+        spool.rollover()
+    spool.seek(0)
+    return UploadFile(file=spool, filename="card.jpg")
+
+
+@pytest.fixture(params=["memory", "disk", "disk_no_sendfile"])
+def upload(request, monkeypatch):
+    """The same upload in memory, on disk, and on disk without sendfile."""
+    if request.param == "disk_no_sendfile":
+        monkeypatch.setattr(utils, "_HAS_SENDFILE", False)
+    return _upload(UPLOAD_DATA, spilled=request.param != "memory")
+
+
+class TestCopyUploadToFile:
+    """Test streaming uploads to disk."""
+
+    @pytest.mark.asyncio
+    async def test_copies_upload(self, upload, tmp_path):
+        """Test that the file on disk matches the upload."""
+        dest = tmp_path / "out.jpg"
+
+        size = await copy_upload_to_file(upload, dest, max_size=len(UPLOAD_DATA))
+
+        assert size == len(UPLOAD_DATA)
+        assert dest.read_bytes() == UPLOAD_DATA
+
+    @pytest.mark.asyncio
+    async def test_reports_oversized_upload(self, upload, tmp_path):
+        """Test that an upload over the limit is reported as such."""
+        size = await copy_upload_to_file(upload, tmp_path / "out.jpg", max_size=len(UPLOAD_DATA) - 1)
+
+        assert size > len(UPLOAD_DATA) - 1
+
+    @pytest.mark.skipif(not utils._HAS_SENDFILE, reason="sendfile between files is Linux-only")
+    def test_sendfile_checks_size_before_copying(self, tmp_path):
+        """Test that an oversized spilled upload is not copied at all."""
+        upload = _upload(UPLOAD_DATA, spilled=True)
+        dest = tmp_path / "out.jpg"
+
+        size = _sendfile_upload(upload.file.fileno(), dest, max_size=len(UPLOAD_DATA) - 1)
+
+        assert size == len(UPLOAD_DATA)
+        assert not dest.exists()
+
+
+class TestSaveUploadFile:
+    """Test the upload size limit and cleanup in the images router."""
+
+    @pytest.mark.asyncio
+    async def test_oversized_upload_is_removed(self, upload, tmp_path, monkeypatch):
+        """Test that a rejected upload leaves no file behind."""
+        monkeypatch.setattr(images, "UPLOAD_DIR", str(tmp_path))
+        monkeypatch.setattr(images, "MAX_FILE_SIZE", len(UPLOAD_DATA) - 1)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await images.save_upload_file(upload, "alice")
+
+        assert exc_info.value.status_code == 413
+        assert os.listdir(tmp_path / "alice") == []
+
+    @pytest.mark.asyncio
+    async def test_upload_within_limit_is_kept(self, upload, tmp_path, monkeypatch):
+        """Test that an accepted upload is stored whole."""
+        monkeypatch.setattr(images, "UPLOAD_DIR", str(tmp_path))
+
+        file_id, file_path, file_size = await images.save_upload_file(upload, "alice")
+
+        assert file_size == len(UPLOAD_DATA)
+        assert file_path == str(tmp_path / "alice" / f"{file_id}.jpg")
+        with open(file_path, "rb") as f:
+            assert f.read() == UPLOAD_DATA
@@ -5,17 +5,122 @@ Includes file handling, validation, and helper functions.
 """
 
 import os
+import time
 import uuid
 from pathlib import Path
 from typing import Optional, List, Tuple
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
 import hashlib
+import io
+import queue
+import sys
+import aiofiles
 from fastapi import UploadFile, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Chunk buffers reused across uploads instead of a new bytes object per read
+_CHUNK_POOL: "queue.SimpleQueue[bytearray]" = queue.SimpleQueue()
+
+# sendfile() between regular files is Linux-only (macOS needs a socket)
+_HAS_SENDFILE = hasattr(os, "sendfile") and sys.platform.startswith("linux")
+
+
+def readinto_upload(upload_file: UploadFile, buf) -> int:
+    """Read the next chunk of an upload into buf (blocking).
+    
+    SpooledTemporaryFile only has readinto() from Python 3.11; on 3.10 this
+    reads through to the in-memory or on-disk file it wraps.
+    
+    Returns:
+        Number of bytes read, 0 at end of file
+    """
+    f = upload_file.file
+    if not hasattr(f, "readinto"):
+        f = f._file
+    return f.readinto(buf)
+
+
+def _spooled_fd(upload_file: UploadFile) -> Optional[int]:
+    """Descriptor of an upload that has spilled to disk, None if in memory.
+    
+    Looks at the wrapped file rather than calling fileno() on the spool,
+    which would force an in-memory upload out to disk.
+    """
+    inner = getattr(upload_file.file, "_file", upload_file.file)
+    if isinstance(inner, io.BytesIO):
+        return None
+    try:
+        inner.flush()  # buffered writes must reach the descriptor
+        return inner.fileno()
+    except (AttributeError, OSError):
+        return None
+
+
+def _sendfile_upload(src_fd: int, file_path, max_size: int) -> int:
+    """Copy a spilled upload kernel-side with sendfile (blocking)."""
+    size = os.fstat(src_fd).st_size
+    if size > max_size:
+        return size
+    
+    with open(file_path, "wb") as dst:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(dst.fileno(), src_fd, offset, size - offset)
+            if not sent:
+                break
+            offset += sent
+    return offset
+
+
+async def copy_upload_to_file(upload_file: UploadFile, file_path, max_size: int) -> int:
+    """Stream an upload to disk.
+    
+    Uploads that have spilled to disk are copied file-to-file with
+    os.sendfile where available (size checked up front, no data through
+    Python); in-memory ones go through a pooled chunk buffer.
+    
+    Args:
+        upload_file: FastAPI UploadFile object
+        file_path: Destination path
+        max_size: Stop copying once more than this many bytes were read
+        
+    Returns:
+        Number of bytes read; greater than max_size if the copy was cut short
+    """
+    fd = _spooled_fd(upload_file)
+    if fd is not None and _HAS_SENDFILE:
+        return await run_in_threadpool(_sendfile_upload, fd, file_path, max_size)
+    
+    try:
+        buf = _CHUNK_POOL.get_nowait()
+    except queue.Empty:
+        buf = bytearray(UPLOAD_CHUNK_SIZE)
+    
+    size = 0
+    try:
+        async with aiofiles.open(file_path, "wb") as f:
+            while True:
+                # The spooled upload may live on disk, so read off the event loop
+                n = await run_in_threadpool(readinto_upload, upload_file, buf)
+                if not n:
+                    break
+                size += n
+                if size > max_size:
+                    break
+                await f.write(memoryview(buf)[:n])
+    finally:
+        _CHUNK_POOL.put(buf)
+    
+    return size
+
 
 def validate_file_extension(filename: str) -> bool:
     """Validate file extension against allowed types.
@@ -91,31 +196,30 @@ async def save_upload_file(upload_file: UploadFile) -> Tuple[str, int]:
     if not validate_file_extension(upload_file.filename):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type not allowed. Allowed types: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+            detail=f"File type not allowed. Allowed types: {', '.join(sorted(settings.ALLOWED_EXTENSIONS))}"
         )
     
     # Create upload directory
     upload_dir = Path(settings.UPLOAD_DIRECTORY)
     upload_dir.mkdir(parents=True, exist_ok=True)
     
-    # Read file content
-    content = await upload_file.read()
-    file_size = len(content)
-    
-    # Validate size
-    if not validate_file_size(file_size):
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
-        )
-    
     # Generate unique filename
     unique_filename = generate_unique_filename(upload_file.filename)
     file_path = upload_dir / unique_filename
     
-    # Save file
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Stream to disk in chunks, validating the size as it grows
+    try:
+        file_size = await copy_upload_to_file(upload_file, file_path, settings.MAX_UPLOAD_SIZE)
+        
+        if not validate_file_size(file_size):
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
+            )
+    except BaseException:
+        # Do not leave partial uploads behind
+        file_path.unlink(missing_ok=True)
+        raise
     
     logger.info(f"File saved: {unique_filename} ({file_size} bytes)")
     
@@ -206,6 +310,23 @@ def get_timestamp() -> datetime:
     return datetime.utcnow()
 
 
+@lru_cache(maxsize=1)
+def _iso_for_second(second: int) -> str:
+    return datetime.fromtimestamp(second, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def utc_timestamp() -> str:
+    """Get current UTC time as an ISO 8601 string, whole seconds.
+    
+    The string is formatted at most once per second and shared by every
+    caller in that second (health checks, status polls, error payloads).
+    
+    Returns:
+        ISO 8601 timestamp, e.g. "2024-01-01T12:00:00"
+    """
+    return _iso_for_second(int(time.time()))
+
+
 def validate_pagination(skip: int, limit: int) -> Tuple[int, int]:
     """Validate pagination parameters.
     
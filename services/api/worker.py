@@ -5,7 +5,10 @@ Handles batch image processing, color detection, and correction jobs.
 
 from celery import Celery, Task
 from celery_config import celery_app
+from config import settings
+import job_store
 import logging
+import redis
 from typing import List, Dict, Optional
 import time
 import os
@@ -19,6 +22,9 @@ logger.setLevel(logging.INFO)
 # Get Celery app instance
 app = celery_app
 
+# Batch job state shared with the API (see job_store)
+job_redis = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
 @app.task(name='worker.detect_color_card')
 def detect_color_card(image_id: str, image_path: str) -> Dict:
     """Detect color card in image using ArUco markers."""
@@ -149,6 +155,67 @@ def correct_color(image_id: str, image_path: str, detection_data: Dict, options:
         logger.error(f"Error correcting color: {str(e)}")
         return {'success': False, 'error': str(e)}
 
+@app.task(name='worker.process_image')
+def process_image(job_id: str, image_id: str, image_path: str, operation: str, options: Optional[Dict] = None) -> Dict:
+    """Run one batch job operation on one uploaded image.
+    
+    Batch jobs fan out one of these per image (see routers/batch.py), routed to
+    the queue for the operation. image_path is the stored upload, resolved and
+    ownership-checked by the API. The outcome is recorded on the job in Redis.
+    """
+    if job_redis.hget(job_store.job_key(job_id), "status") == "cancelled":
+        return {'success': False, 'job_id': job_id, 'image_id': image_id, 'error': 'Job cancelled'}
+    
+    result = _run_operation(image_id, image_path, operation, options)
+    result['job_id'] = job_id
+    result.setdefault('image_id', image_id)
+    
+    job_store.record_result(job_redis, job_id, result)
+    return result
+
+
+def _run_operation(image_id: str, image_path: str, operation: str, options: Optional[Dict]) -> Dict:
+    """Dispatch a batch operation on the uploaded image."""
+    if not os.path.exists(image_path):
+        return {'success': False, 'error': 'Image not found'}
+    
+    if operation == 'detect':
+        result = detect_color_card(image_id, image_path)
+    elif operation in ('correct', 'detect_and_correct'):
+        # Correction needs the card patches, so both run detection first
+        result = detect_color_card(image_id, image_path)
+        if result['success']:
+            result = correct_color(image_id, image_path, result, options)
+    elif operation == 'remove_background':
+        result = remove_background(image_id, image_path)
+    else:
+        result = {'success': False, 'error': f'Unknown operation: {operation}'}
+    
+    return result
+
+
+def remove_background(image_id: str, image_path: str) -> Dict:
+    """Remove the background of an image and save it as PNG."""
+    try:
+        from libs.ml.src.color_ml import BackgroundRemover
+        
+        image = cv2.imread(image_path)
+        if image is None:
+            return {'success': False, 'error': 'Failed to load image'}
+        
+        foreground = BackgroundRemover().remove(image)
+        
+        output_dir = 'outputs'
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, f"{image_id}_foreground.png")
+        cv2.imwrite(output_path, foreground)
+        
+        return {'success': True, 'image_id': image_id, 'output_path': output_path}
+        
+    except Exception as e:
+        logger.error(f"Error removing background: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
 
 if __name__ == '__main__':
     app.start()